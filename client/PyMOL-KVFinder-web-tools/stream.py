@@ -0,0 +1,239 @@
+import re
+import json
+import zlib
+from typing import Optional, Any, Dict, Iterable, Iterator, BinaryIO, List
+
+
+# Path of the cavity PDB inside a job reply
+CAVITY_PATH = ('output', 'pdb_kv')
+# Members of a job reply whose size can be measured (see ReplyStream)
+FIELD_PATHS = [('output', 'pdb_kv'), ('output', 'report'), ('output', 'log')]
+
+_WHITESPACE = b' \t\n\r'
+_NUMBER = b'+-0123456789.eE'
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_ESCAPES = {ord('"'): b'"', ord('\\'): b'\\', ord('/'): b'/', ord('b'): b'\b', ord('f'): b'\f', ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t'}
+
+
+class ReplyStream(object):
+    """ Incremental parser of a job reply (JSON) read chunk by chunk
+
+    When `cavity` is given, output.pdb_kv is decoded straight into it as the
+    chunks arrive and left as None in the parsed reply, so the cavity is
+    never held in memory. Every chunk read is also copied to `tee` (e.g. a
+    cache entry) when given. `size` counts the bytes read.
+
+    `sizes` has the bytes of each member in `fields` (paths that are not
+    nested in one another) as encoded in the reply, by member name. With
+    `compress`, `compressed` has the gzip size of the whole reply
+    ('response') and of each of those members, compressed as they stream.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], cavity: Optional[BinaryIO]=None, tee: Optional[BinaryIO]=None, fields: Iterable[tuple]=(), compress: bool=False):
+        self.chunks: Iterator[bytes] = iter(chunks)
+        self.cavity = cavity
+        self.tee = tee
+        self.size: int = 0
+        self.fields = set(fields)
+        self.compress = compress
+        self.sizes: Dict[str, int] = {}
+        self.compressed: Dict[str, int] = {}
+        self._buffer: bytes = b''
+        self._pos: int = 0
+        # [compressor, start in buffer, compressed bytes] of the member being measured
+        self._field: Optional[list] = None
+        self._compressor = zlib.compressobj(wbits=31) if compress else None
+        if compress:
+            self.compressed['response'] = 0
+
+
+    def read(self) -> Dict[str, Any]:
+        reply = self._value(())
+        # Consume the rest of the body (trailing whitespace)
+        while self._fill():
+            self._pos = len(self._buffer)
+        if self._compressor != None:
+            self.compressed['response'] += len(self._compressor.flush())
+        return reply
+
+
+    def _fill(self) -> bool:
+        # Make sure there is at least one unread byte in the buffer
+        while self._pos >= len(self._buffer):
+            chunk = next(self.chunks, None)
+            if chunk == None:
+                return False
+            self.size += len(chunk)
+            if self.tee != None:
+                self.tee.write(chunk)
+            if self._compressor != None:
+                self.compressed['response'] += len(self._compressor.compress(chunk))
+            if self._field != None:
+                self._feed(len(self._buffer))
+                self._field[1] = 0
+            self._buffer, self._pos = chunk, 0
+        return True
+
+
+    def _feed(self, end: int) -> None:
+        # Pass the bytes of the measured member read so far to its compressor
+        compressor, start, _ = self._field
+        if compressor != None and end > start:
+            self._field[2] += len(compressor.compress(memoryview(self._buffer)[start:end]))
+        self._field[1] = end
+
+
+    def _offset(self) -> int:
+        # Bytes of the reply consumed so far
+        return self.size - len(self._buffer) + self._pos
+
+
+    def _peek(self) -> int:
+        if not self._fill():
+            raise ValueError("Unexpected end of job reply")
+        return self._buffer[self._pos]
+
+
+    def _next(self) -> int:
+        c = self._peek()
+        self._pos += 1
+        return c
+
+
+    def _skip_whitespace(self) -> int:
+        while self._peek() in _WHITESPACE:
+            self._pos += 1
+        return self._buffer[self._pos]
+
+
+    def _expect(self, literal: bytes) -> None:
+        for c in literal:
+            if self._next() != c:
+                raise ValueError(f"Invalid job reply, expected {literal.decode()}")
+
+
+    def _value(self, path: tuple) -> Any:
+        c = self._skip_whitespace()
+        if path in self.fields and self._field == None:
+            return self._measure(path)
+        if c == ord('{'):
+            return self._object(path)
+        elif c == ord('['):
+            return self._array(path)
+        elif c == ord('"'):
+            if path == CAVITY_PATH and self.cavity != None:
+                self._string(self.cavity)
+                return None
+            return self._string()
+        elif c == ord('t'):
+            self._expect(b'true')
+            return True
+        elif c == ord('f'):
+            self._expect(b'false')
+            return False
+        elif c == ord('n'):
+            self._expect(b'null')
+            return None
+        return self._number()
+
+
+    def _measure(self, path: tuple) -> Any:
+        start = self._offset()
+        self._field = [zlib.compressobj(wbits=31) if self.compress else None, self._pos, 0]
+        value = self._value(path)
+        self._feed(self._pos)
+        compressor, _, compressed = self._field
+        self._field = None
+        self.sizes[path[-1]] = self._offset() - start
+        if compressor != None:
+            self.compressed[path[-1]] = compressed + len(compressor.flush())
+        return value
+
+
+    def _object(self, path: tuple) -> Dict[str, Any]:
+        self._expect(b'{')
+        obj = {}
+        if self._skip_whitespace() == ord('}'):
+            self._pos += 1
+            return obj
+        while True:
+            self._skip_whitespace()
+            key = self._string()
+            if self._skip_whitespace() != ord(':'):
+                raise ValueError("Invalid job reply, expected :")
+            self._pos += 1
+            obj[key] = self._value(path + (key,))
+            c = self._skip_whitespace()
+            self._pos += 1
+            if c == ord('}'):
+                return obj
+            if c != ord(','):
+                raise ValueError("Invalid job reply, expected , or }")
+
+
+    def _array(self, path: tuple) -> List[Any]:
+        self._expect(b'[')
+        array = []
+        if self._skip_whitespace() == ord(']'):
+            self._pos += 1
+            return array
+        while True:
+            array.append(self._value(path))
+            c = self._skip_whitespace()
+            self._pos += 1
+            if c == ord(']'):
+                return array
+            if c != ord(','):
+                raise ValueError("Invalid job reply, expected , or ]")
+
+
+    def _number(self) -> Any:
+        token = b''
+        while self._fill() and self._buffer[self._pos] in _NUMBER:
+            start = self._pos
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _NUMBER:
+                self._pos += 1
+            token += self._buffer[start:self._pos]
+        return json.loads(token)
+
+
+    def _string(self, sink: Optional[BinaryIO]=None) -> Optional[str]:
+        # Decode a JSON string into sink, or return it when sink is None
+        self._expect(b'"')
+        parts = [] if sink == None else None
+        write = parts.append if sink == None else sink.write
+        while True:
+            self._peek()
+            match = _STRING_SPECIAL.search(self._buffer, self._pos)
+            end = match.start() if match else len(self._buffer)
+            if end > self._pos:
+                write(self._buffer[self._pos:end])
+            self._pos = end
+            if match == None:
+                continue
+            self._pos += 1
+            if match.group() == b'"':
+                break
+            write(self._escape())
+        if sink == None:
+            return b''.join(parts).decode('utf-8', 'surrogatepass')
+
+
+    def _escape(self) -> bytes:
+        c = self._next()
+        if c != ord('u'):
+            return _ESCAPES[c]
+        code = self._hex4()
+        # Characters outside the BMP come as a surrogate pair of escapes
+        if 0xd800 <= code < 0xdc00 and self._peek() == ord('\\'):
+            self._pos += 1
+            self._expect(b'u')
+            low = self._hex4()
+            if 0xdc00 <= low < 0xe000:
+                return chr(0x10000 + ((code - 0xd800) << 10) + (low - 0xdc00)).encode('utf-8')
+            return chr(code).encode('utf-8', 'surrogatepass') + chr(low).encode('utf-8', 'surrogatepass')
+        return chr(code).encode('utf-8', 'surrogatepass')
+
+
+    def _hex4(self) -> int:
+        return int(bytes(self._next() for _ in range(4)), 16)
@@ -0,0 +1,259 @@
+import math
+import zlib
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Field order of kv::Input and its settings structs in kv/src/lib.rs, which
+# is the order serde_json writes them in
+SETTINGS_FIELDS = {
+    "modes": ["whole_protein_mode", "box_mode", "resolution_mode", "surface_mode", "kvp_mode", "ligand_mode"],
+    "step_size": ["step_size"],
+    "probes": ["probe_in", "probe_out"],
+    "cutoffs": ["volume_cutoff", "ligand_cutoff", "removal_distance"],
+    "visiblebox": ["p1", "p2", "p3", "p4"],
+    "internalbox": ["p1", "p2", "p3", "p4"],
+}
+BOX_POINT_FIELDS = ["x", "y", "z"]
+
+
+def job_tag(data: Dict[str, Any]) -> str:
+    """ Job id the server gives to this input (city::hash64 of its JSON) """
+    return body_tag(canonical_json(data).encode('utf-8'))
+
+
+def body_tag(body: bytes) -> str:
+    """ Job id of a request body built with canonical_json/encode """
+    return str(cityhash64(body))
+
+
+def canonical_json(data: Dict[str, Any]) -> str:
+    """ Serialize a job input exactly like serde_json::to_string(&Input) """
+    return encode(encode_settings(data["settings"]), encode_structure(data["pdb"], data.get("pdb_ligand")))
+
+
+def encode(settings: str, structure: str) -> str:
+    """ Join the encoded settings and structure into a job input """
+    return "{\"settings\":" + settings + "," + structure + "}"
+
+
+def encode_structure(pdb: List[str], pdb_ligand: Optional[List[str]]=None) -> str:
+    """ The "pdb" and "pdb_ligand" members of a job input """
+    return "\"pdb\":" + _lines(pdb) + ",\"pdb_ligand\":" + _lines(pdb_ligand)
+
+
+def encode_settings(settings: Dict[str, Any]) -> str:
+    """ The "settings" member of a job input """
+    groups = []
+    for group, fields in SETTINGS_FIELDS.items():
+        values = []
+        for field in fields:
+            value = settings[group][field]
+            if group in ["visiblebox", "internalbox"]:
+                value = "{" + ",".join(f"\"{c}\":{_float(value[c])}" for c in BOX_POINT_FIELDS) + "}"
+            elif isinstance(value, bool):
+                value = "true" if value else "false"
+            elif isinstance(value, str):
+                value = _string(value)
+            else:
+                value = _float(value)
+            values.append(f"\"{field}\":{value}")
+        groups.append(f"\"{group}\":{{" + ",".join(values) + "}")
+    return "{" + ",".join(groups) + "}"
+
+
+def member_sizes(body: bytes, compress: bool=False) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """ Bytes of a request body built with encode ('request') and of its members
+
+    Members are found by their position in the body, nothing is encoded
+    again. With compress, the gzip size of each is returned as well.
+    """
+    view = memoryview(body)
+    # {"settings":<settings>,"pdb":<pdb>,"pdb_ligand":<pdb_ligand>}
+    pdb = body.index(b',"pdb":')
+    pdb_ligand = body.rindex(b',"pdb_ligand":')
+    members = {
+        'request': view,
+        'settings': view[len(b'{"settings":'):pdb],
+        'pdb': view[pdb + len(b',"pdb":'):pdb_ligand],
+        'pdb_ligand': view[pdb_ligand + len(b',"pdb_ligand":'):-1],
+    }
+    sizes = {name: len(member) for name, member in members.items()}
+    compressed = {name: _gzip_size(member) for name, member in members.items()} if compress else {}
+    return sizes, compressed
+
+
+def _gzip_size(data: memoryview) -> int:
+    compressor = zlib.compressobj(wbits=31)
+    return len(compressor.compress(data)) + len(compressor.flush())
+
+
+def _lines(lines: Optional[List[str]]) -> str:
+    if lines == None:
+        return "null"
+    return "[" + ",".join(_string(line) for line in lines) + "]"
+
+
+_ESCAPES = {'"': '\\"', '\\': '\\\\', '\b': '\\b', '\f': '\\f', '\n': '\\n', '\r': '\\r', '\t': '\\t'}
+_ESCAPES.update({chr(i): f'\\u{i:04x}' for i in range(0x20) if chr(i) not in _ESCAPES})
+_ESCAPE_TABLE = str.maketrans(_ESCAPES)
+
+
+def _string(value: str) -> str:
+    return '"' + value.translate(_ESCAPE_TABLE) + '"'
+
+
+def _float(value: float) -> str:
+    # serde_json writes f64 with ryu: same shortest digits as repr(), but
+    # its own rules for when to switch to scientific notation
+    value = float(value)
+    if math.isnan(value) or math.isinf(value):
+        return "null"
+    sign = "-" if math.copysign(1.0, value) < 0 else ""
+    mantissa, _, exponent = repr(abs(value)).partition("e")
+    integer, _, fraction = mantissa.partition(".")
+    digits = (integer + fraction).lstrip("0")
+    if digits == "":
+        return sign + "0.0"
+    # kk: position of the decimal point relative to the first digit
+    kk = len(integer) + int(exponent or 0) - (len(integer + fraction) - len(digits))
+    digits = digits.rstrip("0")
+    length = len(digits)
+    k = kk - length
+    if 0 <= k and kk <= 16:
+        text = digits + "0" * k + ".0"
+    elif 0 < kk <= 16:
+        text = digits[:kk] + "." + digits[kk:]
+    elif -5 < kk <= 0:
+        text = "0." + "0" * -kk + digits
+    elif length == 1:
+        text = f"{digits}e{kk - 1}"
+    else:
+        text = f"{digits[0]}.{digits[1:]}e{kk - 1}"
+    return sign + text
+
+
+# CityHash64 as compiled into the server by the fasthash crate (smhasher's
+# City.cpp), ported to Python
+_M = 0xffffffffffffffff
+_K0 = 0xc3a5c85c97cb3127
+_K1 = 0xb492b66fbe98f273
+_K2 = 0x9ae16a3b2f90404f
+_K3 = 0xc949d7c7509e6557
+_KMUL = 0x9ddfea08eb382d69
+
+
+def _rotate(value: int, shift: int) -> int:
+    if shift == 0:
+        return value
+    return ((value >> shift) | (value << (64 - shift))) & _M
+
+
+def _shift_mix(value: int) -> int:
+    return value ^ (value >> 47)
+
+
+def _hash_len16(u: int, v: int) -> int:
+    a = ((u ^ v) * _KMUL) & _M
+    a ^= a >> 47
+    b = ((v ^ a) * _KMUL) & _M
+    b ^= b >> 47
+    return (b * _KMUL) & _M
+
+
+def _fetch64(s: bytes, i: int) -> int:
+    return struct.unpack_from("<Q", s, i)[0]
+
+
+def _fetch32(s: bytes, i: int) -> int:
+    return struct.unpack_from("<I", s, i)[0]
+
+
+def _hash_len0to16(s: bytes) -> int:
+    n = len(s)
+    if n > 8:
+        a = _fetch64(s, 0)
+        b = _fetch64(s, n - 8)
+        return _hash_len16(a, _rotate((b + n) & _M, n)) ^ b
+    if n >= 4:
+        a = _fetch32(s, 0)
+        return _hash_len16((n + (a << 3)) & _M, _fetch32(s, n - 4))
+    if n > 0:
+        y = s[0] + (s[n >> 1] << 8)
+        z = n + (s[n - 1] << 2)
+        return (_shift_mix(((y * _K2) ^ (z * _K3)) & _M) * _K2) & _M
+    return _K2
+
+
+def _hash_len17to32(s: bytes) -> int:
+    n = len(s)
+    a = (_fetch64(s, 0) * _K1) & _M
+    b = _fetch64(s, 8)
+    c = (_fetch64(s, n - 8) * _K2) & _M
+    d = (_fetch64(s, n - 16) * _K0) & _M
+    return _hash_len16((_rotate((a - b) & _M, 43) + _rotate(c, 30) + d) & _M, (a + _rotate(b ^ _K3, 20) - c + n) & _M)
+
+
+def _hash_len33to64(s: bytes) -> int:
+    n = len(s)
+    z = _fetch64(s, 24)
+    a = (_fetch64(s, 0) + (n + _fetch64(s, n - 16)) * _K0) & _M
+    b = _rotate((a + z) & _M, 52)
+    c = _rotate(a, 37)
+    a = (a + _fetch64(s, 8)) & _M
+    c = (c + _rotate(a, 7)) & _M
+    a = (a + _fetch64(s, 16)) & _M
+    vf = (a + z) & _M
+    vs = (b + _rotate(a, 31) + c) & _M
+    a = (_fetch64(s, 16) + _fetch64(s, n - 32)) & _M
+    z = _fetch64(s, n - 8)
+    b = _rotate((a + z) & _M, 52)
+    c = _rotate(a, 37)
+    a = (a + _fetch64(s, n - 24)) & _M
+    c = (c + _rotate(a, 7)) & _M
+    a = (a + _fetch64(s, n - 16)) & _M
+    wf = (a + z) & _M
+    ws = (b + _rotate(a, 31) + c) & _M
+    r = _shift_mix(((vf + ws) * _K2 + (wf + vs) * _K0) & _M)
+    return (_shift_mix((r * _K0 + vs) & _M) * _K2) & _M
+
+
+def _weak_hash_len32_with_seeds(s: bytes, i: int, a: int, b: int):
+    w, x, y, z = struct.unpack_from("<4Q", s, i)
+    a = (a + w) & _M
+    b = _rotate((b + a + z) & _M, 21)
+    c = a
+    a = (a + x + y) & _M
+    b = (b + _rotate(a, 44)) & _M
+    return (a + z) & _M, (b + c) & _M
+
+
+def cityhash64(s: bytes) -> int:
+    n = len(s)
+    if n <= 16:
+        return _hash_len0to16(s)
+    if n <= 32:
+        return _hash_len17to32(s)
+    if n <= 64:
+        return _hash_len33to64(s)
+
+    # Hash the end first, then 64-byte chunks keeping 56 bytes of state
+    x = _fetch64(s, n - 40)
+    y = (_fetch64(s, n - 16) + _fetch64(s, n - 56)) & _M
+    z = _hash_len16((_fetch64(s, n - 48) + n) & _M, _fetch64(s, n - 24))
+    v = _weak_hash_len32_with_seeds(s, n - 64, n, z)
+    w = _weak_hash_len32_with_seeds(s, n - 32, (y + _K1) & _M, x)
+    x = (x * _K1 + _fetch64(s, 0)) & _M
+
+    for i in range(0, (n - 1) & ~63, 64):
+        f8, f16, _, _, f40, f48, _ = struct.unpack_from("<7Q", s, i + 8)
+        x = (_rotate((x + y + v[0] + f8) & _M, 37) * _K1) & _M
+        y = (_rotate((y + v[1] + f48) & _M, 42) * _K1) & _M
+        x ^= w[1]
+        y = (y + v[0] + f40) & _M
+        z = (_rotate((z + w[0]) & _M, 33) * _K1) & _M
+        v = _weak_hash_len32_with_seeds(s, i, (v[1] * _K1) & _M, (x + w[0]) & _M)
+        w = _weak_hash_len32_with_seeds(s, i + 32, (z + w[1]) & _M, (y + f16) & _M)
+        z, x = x, z
+
+    return _hash_len16((_hash_len16(v[0], w[0]) + _shift_mix(y) * _K1 + z) & _M, (_hash_len16(v[1], w[1]) + x) & _M)
@@ -0,0 +1,90 @@
+import time
+import random
+import threading
+import requests
+from typing import Optional, Any, Dict, Tuple, Union
+
+
+# (connect, read) timeout in seconds
+Timeout = Union[float, Tuple[float, float]]
+
+
+class Transport(object):
+    """ Keep-alive HTTP session to one KVFinder-web server with retries """
+
+    def __init__(self, server: str, connections: int=10, retries: int=5, backoff: float=0.5, max_backoff: float=30.0, timeout: Timeout=(5.0, 60.0)):
+        self.server = server.rstrip('/')
+        self.connections = connections
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        # One connection pool for this server, reused by every request
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+
+    def request(self, method: str, path: str, timeout: Optional[Timeout]=None, **kwargs) -> requests.Response:
+        """ Send a request, retrying on connection errors, timeouts and 5xx replies
+
+        Every endpoint is safe to repeat: GETs are read-only and /create
+        returns the already queued job when the same input is sent twice.
+        After the last attempt the error is raised or the 5xx reply returned.
+        """
+        url = self.server + path
+        timeout = self.timeout if timeout == None else timeout
+        for attempt in range(self.retries + 1):
+            try:
+                r = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            else:
+                if r.status_code < 500 or attempt == self.retries:
+                    return r
+                r.close()
+            time.sleep(self._delay(attempt))
+
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request('GET', path, **kwargs)
+
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', path, **kwargs)
+
+
+    def close(self) -> None:
+        self.session.close()
+
+
+    def _delay(self, attempt: int) -> float:
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+_transports: Dict[str, Transport] = {}
+# Clients of the same server may connect from several threads
+_lock = threading.Lock()
+
+
+def connect(server: str, **kwargs: Any) -> Transport:
+    """ Get the shared Transport of a server, creating it on first use
+
+    Raises ValueError if the server's Transport was created with settings
+    (connections, retries, backoff, max_backoff, timeout) other than kwargs.
+    """
+    server = server.rstrip('/')
+    with _lock:
+        if server not in _transports:
+            _transports[server] = Transport(server, **kwargs)
+        transport = _transports[server]
+    for setting, value in kwargs.items():
+        if not hasattr(transport, setting):
+            raise TypeError(f"connect() got an unexpected keyword argument '{setting}'")
+        if getattr(transport, setting) != value:
+            raise ValueError(f"{server} is already connected with {setting}={getattr(transport, setting)!r}, not {value!r}")
+    return transport
@@ -0,0 +1,76 @@
+import numpy as np
+from typing import Optional, Any, Dict
+# Also imported from the PyMOL plugin package, which has a copy of this module
+try:
+    from .structure import read_atoms, coordinates
+except ImportError:
+    from structure import read_atoms, coordinates
+
+
+def check(data: Dict[str, Any], atoms: Optional[np.ndarray]=None) -> None:
+    """ Same rules as Input::check in kv/src/lib.rs
+
+    Raises ValueError with the message kv-server would reply for an input
+    it rejects. `atoms` are the parsed records of data["pdb"], if available.
+    """
+    settings = data["settings"]
+    modes = settings["modes"]
+    probes = settings["probes"]
+    cutoffs = settings["cutoffs"]
+
+    # Compare Whole protein and Box modes
+    if modes["whole_protein_mode"] == modes["box_mode"]:
+        raise ValueError("Invalid parameters file! Whole protein and box modes cannot be equal!")
+    # Compare resolution mode
+    if modes["resolution_mode"] != "Low":
+        raise ValueError("Invalid parameters file! Resolution mode is restricted to Low option on this web service!")
+    # Probe In
+    if probes["probe_in"] < 0.0 or probes["probe_in"] > 5.0:
+        raise ValueError("Invalid parameters file! Probe In must be between 0 and 5!")
+    # Probe Out
+    if probes["probe_out"] < 0.0 or probes["probe_out"] > 50.0:
+        raise ValueError("Invalid parameters file! Probe Out must be between 0 and 50!")
+    # Compare probes
+    if probes["probe_out"] < probes["probe_in"]:
+        raise ValueError("Invalid parameters file! Probe Out must be greater than Probe In!")
+    # Removal distance
+    if cutoffs["removal_distance"] < 0.0 or cutoffs["removal_distance"] > 10.0:
+        raise ValueError("Invalid parameters file! Removal distance must be between 0 and 10!")
+    # Volume Cutoff
+    if cutoffs["volume_cutoff"] < 0.0:
+        raise ValueError("Invalid parameters file! Volume cutoff must be greater than 0!")
+    # Cavity representation
+    if modes["kvp_mode"]:
+        raise ValueError("Invalid parameters file! Cavity Representation (kvp_mode) must be false on this webservice!")
+    # Ligand mode and pdb
+    if modes["ligand_mode"] and data.get("pdb_ligand") == None:
+        raise ValueError("Invalid parameters file! A ligand must be provided when Ligand mode is set to true!")
+    elif not modes["ligand_mode"] and data.get("pdb_ligand") != None:
+        raise ValueError("Invalid parameters file! The Ligand mode must be set to true when providing a ligand!")
+    # Ligand Cutoff
+    if cutoffs["ligand_cutoff"] <= 0.0:
+        raise ValueError("Invalid parameters file! Ligand cutoff must be greater than 0!")
+
+    # Box inside pdb grid
+    if modes["box_mode"]:
+        if atoms is None:
+            atoms = read_atoms(data["pdb"])
+        if not box_inside_grid(settings, atoms):
+            raise ValueError("Invalid parameters file! Inconsistent box coordinates!")
+
+
+def box_inside_grid(settings: Dict[str, Any], atoms: np.ndarray) -> bool:
+    """ Whether every internal box point lies inside the server's pdb grid
+
+    Like get_pdb_boundaries, the grid spans ATOM records (not HETATM)
+    extended by probe_out + 20 A on each side.
+    """
+    atoms = atoms[atoms['record'] == 'ATOM']
+    if len(atoms) == 0:
+        raise ValueError("parsing error")
+    xyz = coordinates(atoms)
+    margin = settings["probes"]["probe_out"] + 20.0
+    lower = xyz.min(axis=0) - margin
+    upper = xyz.max(axis=0) + margin
+    box = np.array([[settings["internalbox"][p][c] for c in "xyz"] for p in ["p1", "p2", "p3", "p4"]])
+    return bool(np.all(box >= lower) and np.all(box <= upper))
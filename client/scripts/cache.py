@@ -0,0 +1,91 @@
+import os
+import json
+import threading
+from typing import Optional, Any, Dict, BinaryIO
+
+
+class ResultCache(object):
+    """ Disk-backed LRU cache of completed job replies keyed by job tag """
+
+    def __init__(self, directory: str=os.path.join(os.path.expanduser('~'), '.cache', 'KVFinder-web'), max_size: int=1_000_000_000):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+        # Bytes currently on disk, so eviction only scans the directory when needed
+        self.size = sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith('.json'))
+        # Replies may be stored from several threads
+        self._lock = threading.Lock()
+
+
+    def __contains__(self, tag: str) -> bool:
+        return os.path.exists(self._path(tag))
+
+
+    def get(self, tag: str) -> Optional[Dict[str, Any]]:
+        """ Cached reply of a job, or None """
+        fn = self._path(tag)
+        try:
+            with open(fn, 'r') as f:
+                reply = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # Mark as recently used
+        os.utime(fn)
+        return reply
+
+
+    def open(self, tag: str) -> Optional[BinaryIO]:
+        """ Cached reply of a job as a binary file to be streamed, or None """
+        fn = self._path(tag)
+        try:
+            f = open(fn, 'rb')
+        except FileNotFoundError:
+            return None
+        os.utime(fn)
+        return f
+
+
+    def temporary(self, tag: str) -> str:
+        """ Path where a reply may be written before put_file """
+        return f"{self._path(tag)}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+    def put_file(self, tag: str, fn: str) -> None:
+        """ Move a reply already written to disk (see temporary) into the cache """
+        entry_fn = self._path(tag)
+        with self._lock:
+            if os.path.exists(entry_fn):
+                self.size -= os.path.getsize(entry_fn)
+            os.replace(fn, entry_fn)
+            self.size += os.path.getsize(entry_fn)
+            if self.size > self.max_size:
+                self._evict()
+
+
+    def put(self, tag: str, reply: Dict[str, Any]) -> None:
+        """ Store the reply of a completed job """
+        if reply.get('status') != 'completed':
+            return
+        # Write to a temporary file first so readers never see partial entries
+        tmp_fn = self.temporary(tag)
+        with open(tmp_fn, 'w') as f:
+            json.dump(reply, f)
+        self.put_file(tag, tmp_fn)
+
+
+    def _evict(self) -> None:
+        # Remove least recently used entries until the cache fits in max_size
+        entries = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in os.scandir(self.directory) if entry.name.endswith('.json'))
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, fn in entries:
+            if self.size <= self.max_size:
+                break
+            try:
+                os.remove(fn)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+
+    def _path(self, tag: str) -> str:
+        return os.path.join(self.directory, f'{tag}.json')
@@ -1,19 +1,74 @@
+import re
 import json
-from typing import Optional, Any, Dict
+import copy
+import heapq
+import asyncio
+import itertools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Any, Dict, List, Tuple, Callable, Iterable
 import requests
-import zlib
 from time import sleep
+from transport import connect
+from cache import ResultCache
+from tag import body_tag, encode, encode_settings, encode_structure
+from sweep import Grid, variants
+from structure import read_atoms, count_atoms, bounding_box
+from model import LinearModel, ELAPSED_TIME
+import validation
+import crop
 
 class KVJob:
     def __init__(self, path_protein_pdb: str, path_ligand_pdb: Optional[str]=None):
         self.id: Optional[str] = None
         self.input: Optional[Dict[str, Any]] = {}
         self.output: Optional[Dict[str, Any]] = None 
+        # parsed ATOM/HETATM records (see structure.read_atoms)
+        self.atoms = None
+        self.ligand_atoms = None
+        # (pdb, pdb_ligand, encoded structure), shared by sweep variants
+        self._structure = None
         self._add_pdb(path_protein_pdb)
         if path_ligand_pdb != None:
             self._add_pdb(path_ligand_pdb, is_ligand=True)
         self._default_settings()
 
+    @property
+    def tag(self) -> str:
+        # id the server assigns to this input
+        return body_tag(self.body())
+
+    def body(self) -> bytes:
+        # JSON request body, encoding the pdb lines only once per structure
+        return encode(encode_settings(self.input["settings"]), self._encoded_structure()).encode("utf-8")
+
+    def _encoded_structure(self) -> str:
+        pdb, pdb_ligand = self.input["pdb"], self.input.get("pdb_ligand")
+        if self._structure == None or self._structure[0] is not pdb or self._structure[1] is not pdb_ligand:
+            self._structure = (pdb, pdb_ligand, encode_structure(pdb, pdb_ligand))
+        return self._structure[2]
+
+    def sweep(self, grid: Grid) -> List["KVJob"]:
+        # one job per distinct combination of settings in grid, all sharing this structure
+        jobs = []
+        self._encoded_structure()
+        for settings in variants(self.input["settings"], grid):
+            kv_job = copy.copy(self)
+            kv_job.id = None
+            kv_job.output = None
+            kv_job.input = dict(self.input, settings=settings)
+            jobs.append(kv_job)
+        return jobs
+
+    @property
+    def n_atoms(self) -> int:
+        return count_atoms(self.atoms)
+
+    @property
+    def bounding_box(self):
+        # (min xyz, max xyz) of protein atoms
+        return bounding_box(self.atoms)
+
     @property
     def kv_pdb(self):
         if self.output == None:
@@ -35,13 +90,35 @@ class KVJob:
         else:
             return self.output["output"]["log"]
 
+    def estimate_runtime(self, model: Optional[LinearModel]=None) -> float:
+        # expected parKVFinder run time (s) of this job, without queue time (see model.py)
+        model = ELAPSED_TIME if model == None else model
+        settings = self.input["settings"]
+        return float(model.predict(self.n_atoms, settings["probes"]["probe_out"], settings["cutoffs"]["removal_distance"])[0])
+
+    def check(self) -> None:
+        # raise ValueError if the server would reject this job
+        validation.check(self.input, self.atoms)
+
+    def crop(self, padding: float=2.0) -> int:
+        # drop atoms outside the ligand/box search space, returns number of atoms removed
+        pdb = crop.crop(self.input, self.atoms, self.ligand_atoms, padding)
+        if pdb == None:
+            return 0
+        n_atoms = len(self.atoms)
+        self.input["pdb"] = pdb
+        self.atoms = read_atoms(pdb)
+        return n_atoms - len(self.atoms)
+
     def _add_pdb(self, pdb_fn: str, is_ligand: bool=False):
         with open(pdb_fn) as f:
             pdb = f.readlines()
         if is_ligand:
             self.input["pdb_ligand"] = pdb
+            self.ligand_atoms = read_atoms(pdb)
         else:
             self.input["pdb"] = pdb
+            self.atoms = read_atoms(pdb)
 
     def _default_settings(self):
         self.input["settings"] = {}
@@ -76,19 +153,264 @@ class KVJob:
             "p4" : {"x" : -4.00, "y" : -4.00, "z" : 4.00},
         }
 
+class PollScheduler:
+    """ Poll submitted jobs of a KVClient from a single timer
+
+    Each job has the time of its next check in a heap, and the scheduler
+    sleeps until the earliest one. All due jobs are checked with one
+    POST /status request, and the results of the completed ones are all
+    downloaded at once, while the scheduler goes on with the next checks.
+    Requests run on `executor` and share the client's transport.
+
+    The next check of each job follows its last status (see next_check):
+    backing off from `interval` up to `max_interval` while queued, closing
+    in on the estimated completion while running. A job is not checked
+    again once its results are downloaded.
+
+    Failed requests (once the transport gives up retrying) are repeated
+    with backoff; after `retries` failures in a row the job's future is
+    failed with the error. If the scheduler stops, the futures of jobs
+    still polled are failed too, so no caller waits forever.
+    """
+
+    def __init__(self, client: "KVClient", executor: Executor, interval: float=2.0, max_interval: float=60.0, backoff: float=2.0, retries: int=5):
+        self.client = client
+        self.executor = executor
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.retries = retries
+        # (next check, sequence, poll), earliest first
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        # polls whose future is not done yet
+        self._pending: Dict[int, Dict[str, Any]] = {}
+
+    def add(self, kv_job: KVJob, estimate: float) -> asyncio.Future:
+        """ Poll a submitted job, first once its estimated run time (s) has passed
+
+        The future is done with the job output, or None if the job timed out
+        or is not in the server anymore.
+        """
+        loop = asyncio.get_running_loop()
+        poll = {
+            'kv_job': kv_job,
+            'estimate': estimate,
+            'future': loop.create_future(),
+            # local time the job was created in the server (about)
+            'submitted': loop.time(),
+            'queued_checks': 0,
+            # requests failed in a row
+            'failures': 0,
+        }
+        self._pending[id(poll)] = poll
+        self._schedule(poll, max(self.interval, estimate))
+        return poll['future']
+
+    def next_check(self, poll: Dict[str, Any], status: Dict[str, Any], now: float) -> float:
+        """ Seconds until the next check of a job that is not finished """
+        if status.get('status') != 'running':
+            # back off while the job waits for a kv-worker
+            poll['queued_checks'] += 1
+            return min(self.max_interval, self.interval * self.backoff ** poll['queued_checks'])
+        # local start time, from the time between creation and start in the
+        # server clock (so clock skew between client and server cancels out)
+        started = poll['submitted'] + _seconds(status['created_at'], status['started_at']) if status.get('started_at') else now
+        remaining = started + poll['estimate'] - now
+        if remaining > 0:
+            # halve the wait each check, closing in on the estimated completion
+            return max(self.interval, remaining / 2)
+        # late: back off with how far the estimate was exceeded
+        return min(self.max_interval, max(self.interval, -remaining / 4))
+
+    async def run(self) -> None:
+        """ Check jobs as they become due, until cancelled
+
+        When it returns, the futures of jobs not finished are failed (with
+        the error that stopped the scheduler, if any).
+        """
+        try:
+            await self._run()
+        except BaseException as e:
+            error = e if isinstance(e, Exception) else RuntimeError('PollScheduler stopped')
+            for poll in list(self._pending.values()):
+                self._finish(poll, error=error)
+            raise
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            delay = self._heap[0][0] - loop.time() if self._heap else None
+            if delay == None or delay > 0:
+                # sleep until the next check, or until an earlier one is added
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = []
+            while self._heap and self._heap[0][0] <= loop.time():
+                due.append(heapq.heappop(self._heap)[2])
+            try:
+                statuses = await loop.run_in_executor(self.executor, self.client._get_statuses, [poll['kv_job'].id for poll in due])
+            except requests.RequestException as e:
+                for poll in due:
+                    self._retry(poll, e)
+                continue
+
+            now = loop.time()
+            for poll in due:
+                status = statuses.get(poll['kv_job'].id, {})
+                if status == None or status.get('status') in ['timed_out', 'cancelled']:
+                    self._finish(poll, None)
+                elif status.get('status') == 'completed':
+                    asyncio.ensure_future(self._download(poll))
+                elif 'status' not in status:
+                    # failed batch, server error for this id or id missing from the reply
+                    self._retry(poll, requests.HTTPError(status.get('error', 'no status of job ' + poll['kv_job'].id)))
+                else:
+                    poll['failures'] = 0
+                    self._schedule(poll, self.next_check(poll, status, now))
+
+    async def _download(self, poll: Dict[str, Any]) -> None:
+        try:
+            output = await asyncio.get_running_loop().run_in_executor(self.executor, self.client._download, poll['kv_job'])
+        except requests.RequestException as e:
+            self._retry(poll, e)
+        except Exception as e:
+            self._finish(poll, error=e)
+        else:
+            if output == None:
+                self._schedule(poll, self.interval)
+            else:
+                self._finish(poll, output)
+
+    def _retry(self, poll: Dict[str, Any], error: Exception) -> None:
+        # check again after a failed request, backing off, or give up
+        poll['failures'] += 1
+        if poll['failures'] > self.retries:
+            self._finish(poll, error=error)
+        else:
+            self._schedule(poll, min(self.max_interval, self.interval * self.backoff ** poll['failures']))
+
+    def _finish(self, poll: Dict[str, Any], output: Optional[Dict[str, Any]]=None, error: Optional[BaseException]=None) -> None:
+        self._pending.pop(id(poll), None)
+        if poll['future'].done():
+            return
+        if error != None:
+            poll['future'].set_exception(error)
+        else:
+            poll['future'].set_result(output)
+
+    def _schedule(self, poll: Dict[str, Any], delay: float) -> None:
+        due = asyncio.get_running_loop().time() + delay
+        if not self._heap or due < self._heap[0][0]:
+            self._wakeup.set()
+        heapq.heappush(self._heap, (due, next(self._sequence), poll))
+
+def _seconds(start: str, end: str) -> float:
+    # seconds between two server timestamps (RFC 3339, with any number of fraction digits)
+    start, end = [datetime.fromisoformat(re.sub(r'(\.\d{6})\d+', r'\1', t).replace('Z', '+00:00')) for t in [start, end]]
+    return (end - start).total_seconds()
+
 class KVClient:
-    def __init__(self, server: str, port="80"):
+    def __init__(self, server: str, port="80", connections: int=10, cache: Optional[ResultCache]=None, model: Optional[LinearModel]=None):
         self.server = f"{server}:{port}"
+        # completed results by job tag, checked before any request
+        self.cache = cache
+        # run time model used to order and poll batches (see model.py)
+        self.model = model
+        # keep-alive connections shared by every request to this server
+        self.connections = connections
+        self.transport = connect(self.server, connections=connections)
 
     def run(self, kv_job: KVJob):
-        if self._submit(kv_job):
+        if self._from_cache(kv_job):
+            print("OK")
+        elif self._submit(kv_job):
             while kv_job.output == None:
                 kv_job.output = self._get_results(kv_job)
                 sleep(2)
+            self._to_cache(kv_job)
             print("OK")
 
+    def run_many(self, kv_jobs: Iterable[KVJob], concurrency: int=100, interval: float=2.0, callback: Optional[Callable[[KVJob], None]]=None, shortest_first: bool=True, max_interval: float=60.0) -> List[KVJob]:
+        """ Submit and wait for many jobs concurrently """
+        return asyncio.run(self.gather(kv_jobs, concurrency, interval, callback, shortest_first, max_interval))
+
+    async def gather(self, kv_jobs: Iterable[KVJob], concurrency: int=100, interval: float=2.0, callback: Optional[Callable[[KVJob], None]]=None, shortest_first: bool=True, max_interval: float=60.0) -> List[KVJob]:
+        """ Submit and poll jobs with at most `concurrency` jobs in flight
+
+        Blocking HTTP calls run on a thread pool sized to the connection pool,
+        so waiting jobs only hold a semaphore slot, not a thread. `callback`
+        is called with each job as soon as it finishes (kv_job.output is None
+        if the submission failed, the job timed out or expired).
+
+        With shortest_first, jobs are submitted in order of estimated run
+        time, which lowers the mean completion time of the batch. Submitted
+        jobs are polled by one PollScheduler: each job is first checked once
+        its estimated run time has passed, then between `interval` and
+        `max_interval` seconds apart depending on its status. Jobs are
+        returned in the order given.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        kv_jobs = list(kv_jobs)
+        estimates = [kv_job.estimate_runtime(self.model) for kv_job in kv_jobs]
+        order = sorted(range(len(kv_jobs)), key=estimates.__getitem__) if shortest_first else range(len(kv_jobs))
+
+        with ThreadPoolExecutor(max_workers=self.connections) as executor:
+            scheduler = PollScheduler(self, executor, interval, max_interval)
+            poller = asyncio.ensure_future(scheduler.run())
+
+            # look up every job in the cache first, so the lookups finishing
+            # out of order cannot reorder the submissions below
+            cached = await asyncio.gather(*(loop.run_in_executor(executor, self._from_cache, kv_job) for kv_job in kv_jobs))
+
+            async def _run(kv_job: KVJob, estimate: float, cached: bool) -> KVJob:
+                if not cached:
+                    async with semaphore:
+                        if await loop.run_in_executor(executor, self._submit, kv_job):
+                            kv_job.output = await scheduler.add(kv_job, estimate)
+                            await loop.run_in_executor(executor, self._to_cache, kv_job)
+                if callback != None:
+                    callback(kv_job)
+                return kv_job
+
+            # tasks take semaphore slots in the order they are created
+            tasks = {i: asyncio.ensure_future(_run(kv_jobs[i], estimates[i], cached[i])) for i in order}
+            try:
+                await asyncio.gather(*tasks.values())
+            finally:
+                poller.cancel()
+            return [tasks[i].result() for i in range(len(kv_jobs))]
+
+    def _from_cache(self, kv_job) -> bool:
+        if self.cache == None:
+            return False
+        tag = kv_job.tag
+        output = self.cache.get(tag)
+        if output == None:
+            return False
+        kv_job.id = tag
+        kv_job.output = output
+        return True
+
+    def _to_cache(self, kv_job) -> None:
+        if self.cache != None and kv_job.output != None:
+            self.cache.put(kv_job.tag, kv_job.output)
+
     def _submit(self, kv_job) -> bool:
-        r = requests.post(self.server + '/create', json=kv_job.input)
+        # reject invalid jobs before uploading them
+        try:
+            kv_job.check()
+        except ValueError as e:
+            print("Invalid job:", e)
+            return False
+        r = self.transport.post('/create', data=kv_job.body(), headers={'Content-Type': 'application/json'})
         if r.ok:
             kv_job.id = r.json()['id']
             return True
@@ -97,24 +419,57 @@ class KVClient:
             print(r.text)
             return False
 
-    def _get_results(self, kv_job) -> Optional[Dict[str, Any]]:
-        r = requests.get(self.server + '/' + kv_job.id)
+    def _get_status(self, kv_job) -> Optional[Dict[str, Any]]:
+        # job status and timestamps, without output
+        r = self.transport.get('/' + kv_job.id + '/status')
         if r.ok:
-            results = r.json()
-            if results['status'] == 'completed':
-                return results
-            else:
-                print(results)
-                return None
+            return r.json()
         else:
             # print(r)
             return None
+
+    def _get_statuses(self, job_ids: List[str], batch_size: int=500) -> Dict[str, Optional[Dict[str, Any]]]:
+        # status of many jobs (None if not found), one request per batch;
+        # ids of a failed batch get {'error': reason} instead of a status
+        statuses = {}
+        for i in range(0, len(job_ids), batch_size):
+            batch = job_ids[i:i + batch_size]
+            try:
+                r = self.transport.post('/status', json={'ids': batch})
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if r.ok:
+                    statuses.update(r.json())
+                    continue
+                error = f"{r.status_code} {r.reason}: {r.text}"
+            statuses.update({job_id: {'error': error} for job_id in batch})
+        return statuses
+
+    def _get_results(self, kv_job) -> Optional[Dict[str, Any]]:
+        status = self._get_status(kv_job)
+        if status == None:
+            return None
+        if status['status'] != 'completed':
+            print(status)
+            return None
+        return self._download(kv_job)
+
+    def _download(self, kv_job) -> Optional[Dict[str, Any]]:
+        # download output only once, after completion
+        r = self.transport.get('/' + kv_job.id)
+        if r.ok:
+            return r.json()
+        else:
+            return None
     
 
 if __name__ == "__main__":
     # create and configure a KVClient with server url and port (default 80)
     # local server 
     kv = KVClient("http://localhost", "8081")
+    # reuse results of inputs already processed (~/.cache/KVFinder-web)
+    # kv = KVClient("http://localhost", "8081", cache=ResultCache())
     # remote server
     # kv = KVClient("http://parkvfinder")
     # create a job using a pdb file with default configuration (code to configure is not implemented)
@@ -123,3 +478,8 @@ if __name__ == "__main__":
     kv.run(job)
     # print job results
     print(json.dumps(job.output, indent=2))
+    # send many jobs at once and get notified as each one finishes
+    # jobs = [KVJob(pdb) for pdb in ["kv1000/4GOU_A.pdb", "kv1000/1FMO_E.pdb"]]
+    # or many settings for the same structure
+    # jobs = job.sweep({"probes.probe_out": [4.0, 6.0, 8.0], "cutoffs.removal_distance": [0.0, 2.4]})
+    # kv.run_many(jobs, concurrency=100, callback=lambda j: print(j.id, "OK"))
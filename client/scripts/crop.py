@@ -0,0 +1,89 @@
+import numpy as np
+from typing import Optional, Any, Dict, List
+# Also imported from the PyMOL plugin package, which has a copy of this module
+try:
+    from .structure import coordinates
+    from .validation import box_inside_grid
+except ImportError:
+    from structure import coordinates
+    from validation import box_inside_grid
+
+
+# Records dropped together with the atoms they refer to
+ATOM_RECORDS = ('ATOM', 'HETATM', 'ANISOU', 'CONECT')
+
+
+def search_space(settings: Dict[str, Any], atoms: np.ndarray, ligand_atoms: Optional[np.ndarray]=None, padding: float=2.0) -> np.ndarray:
+    """ Mask of the atoms that can affect cavities found with these settings
+
+    In ligand mode only atoms within ligand_cutoff of the ligand, and in box
+    mode only atoms inside the internal box, plus a margin, are kept. Whole
+    protein mode keeps every atom.
+
+    A grid point is decided by the Probe Out sphere rolling over it, whose
+    center may lie probe_out away, touching atoms up to probe_out from that
+    center, and the surface removal then reaches removal_distance further.
+    The margin is therefore 2 * probe_out + removal_distance + `padding`
+    (atomic radius allowance), so cropping leaves the cavities unchanged.
+    """
+    keep = np.ones(len(atoms), dtype=bool)
+    modes = settings["modes"]
+    xyz = coordinates(atoms)
+    margin = 2 * settings["probes"]["probe_out"] + settings["cutoffs"]["removal_distance"] + padding
+
+    if modes["box_mode"]:
+        box = np.array([[settings["internalbox"][p][c] for c in "xyz"] for p in ["p1", "p2", "p3", "p4"]])
+        keep &= np.all((xyz >= box.min(axis=0) - margin) & (xyz <= box.max(axis=0) + margin), axis=1)
+
+    if modes["ligand_mode"] and ligand_atoms is not None and len(ligand_atoms) > 0:
+        radius = settings["cutoffs"]["ligand_cutoff"] + margin
+        keep &= _near(xyz, coordinates(ligand_atoms), radius)
+
+    return keep
+
+
+def _near(xyz: np.ndarray, reference: np.ndarray, radius: float, chunk: int=4096) -> np.ndarray:
+    # Whether each point lies within radius of any reference point
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        # Brute force in chunks to bound memory (reference is usually small)
+        near = np.zeros(len(xyz), dtype=bool)
+        for i in range(0, len(xyz), chunk):
+            d2 = ((xyz[i:i + chunk, None, :] - reference[None, :, :]) ** 2).sum(axis=2)
+            near[i:i + chunk] = (d2 <= radius ** 2).any(axis=1)
+        return near
+    distances, _ = cKDTree(reference).query(xyz, k=1, distance_upper_bound=radius)
+    return np.isfinite(distances)
+
+
+def crop(data: Dict[str, Any], atoms: np.ndarray, ligand_atoms: Optional[np.ndarray]=None, padding: float=2.0) -> Optional[List[str]]:
+    """ PDB lines of data["pdb"] without atoms outside the search space
+
+    Returns None when nothing can be removed or when the cropped structure
+    would no longer contain the internal box (the server would reject it).
+    """
+    keep = search_space(data["settings"], atoms, ligand_atoms, padding)
+    if keep.all():
+        return None
+    if data["settings"]["modes"]["box_mode"]:
+        try:
+            if not box_inside_grid(data["settings"], atoms[keep]):
+                return None
+        except ValueError:
+            return None
+
+    lines = data["pdb"]
+    kept = set(atoms['line'][keep].tolist())
+    serials = {lines[i][6:11].strip() for i in kept}
+    return [line for i, line in enumerate(lines) if i in kept or not line.startswith(ATOM_RECORDS) or _refers_to(line, serials)]
+
+
+def _refers_to(line: str, serials: set) -> bool:
+    # ANISOU records of kept atoms, and CONECT records whose atoms are all kept
+    if line.startswith('ANISOU'):
+        return line[6:11].strip() in serials
+    if line.startswith('CONECT'):
+        referred = [line[i:i + 5].strip() for i in range(6, 31, 5)]
+        return all(serial in serials for serial in referred if serial != '')
+    return False
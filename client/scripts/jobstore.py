@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Optional, Any, Dict, List, Iterable
+
+
+# Job states written by Sender (queued) and Retriever (the rest)
+PENDING = ['queued', 'running']
+FINISHED = ['completed', 'timed_out', 'not_found', 'failed']
+
+
+class JobStore(object):
+    """ Index of submitted jobs in one SQLite database
+
+    One row per job with its id (the server tag, a hash of input and
+    settings), status, files, settings and local timestamps. Rows are
+    written when a job is submitted and when its status changes, each
+    write in its own transaction, and jobs are looked up by status instead
+    of scanning a directory of job.toml files.
+    """
+
+    def __init__(self, fn: str='.KVFinder-web/jobs.db'):
+        self.fn = fn
+        os.makedirs(os.path.dirname(fn) or '.', exist_ok=True)
+        # Shared by the threads of one process, serialized by _lock
+        self.connection = sqlite3.connect(fn, timeout=30.0, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            # Sender and Retriever may run in different processes
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    pdb TEXT,
+                    ligand TEXT,
+                    archive TEXT,
+                    output TEXT,
+                    base_name TEXT,
+                    probe_out REAL,
+                    removal_distance REAL,
+                    settings TEXT,
+                    payload TEXT,
+                    submitted_at REAL,
+                    updated_at REAL
+                )""")
+            self.connection.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)')
+
+
+    def add(self, job: Any, status: str='queued') -> None:
+        """ Record a submitted job (replacing an earlier row with the same id)
+
+        job is a performance.Job or a Job of the PyMOL plugin, which has no
+        archive or payload, and no settings (None values) when its ID was
+        added manually.
+        """
+        now = time.time()
+        settings = job.input.get('settings')
+        probe_out = settings['probes']['probe_out'] if settings and settings.get('probes') else None
+        removal_distance = settings['cutoffs']['removal_distance'] if settings and settings.get('cutoffs') else None
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job.id, status, job.pdb, job.ligand, getattr(job, 'archive', None), job.output_directory, job.base_name,
+                 probe_out, removal_distance, json.dumps(settings), json.dumps(getattr(job, 'payload', None)), now, now),
+            )
+
+
+    def update(self, statuses: Dict[str, str]) -> int:
+        """ Set the status of jobs (id -> status), only rows whose status changes are written
+
+        Returns the number of rows changed.
+        """
+        now = time.time()
+        with self._lock, self.connection:
+            cursor = self.connection.executemany(
+                'UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status != ?',
+                [(status, now, job_id, status) for job_id, status in statuses.items()],
+            )
+            return cursor.rowcount
+
+
+    def statuses(self, status: Optional[Iterable[str]]=None) -> Dict[str, str]:
+        """ id -> status of the jobs in any of `status` (default: all), oldest first """
+        with self._lock:
+            if status == None:
+                rows = self.connection.execute('SELECT id, status FROM jobs ORDER BY submitted_at').fetchall()
+            else:
+                status = list(status)
+                rows = self.connection.execute(f"SELECT id, status FROM jobs WHERE status IN ({', '.join('?' * len(status))}) ORDER BY submitted_at", status).fetchall()
+        return {row['id']: row['status'] for row in rows}
+
+
+    def ids(self, status: Optional[Iterable[str]]=None) -> List[str]:
+        return list(self.statuses(status))
+
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """ Row of a job, settings and payload decoded """
+        with self._lock:
+            row = self.connection.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row == None:
+            return None
+        info = dict(row)
+        info['settings'] = json.loads(info['settings'])
+        info['payload'] = json.loads(info['payload'])
+        return info
+
+
+    def load(self, job_id: str) -> Optional[Any]:
+        """ performance.Job of a recorded job, as Job.load does from job.toml """
+        from performance import Job
+        info = self.get(job_id)
+        if info == None:
+            return None
+        job = Job(info['pdb'], info['ligand'], info['probe_out'], info['removal_distance'], archive=info['archive'])
+        job.id = job_id
+        job.status = info['status']
+        job.output_directory = info['output']
+        job.base_name = info['base_name']
+        job.payload = info['payload']
+        return job
+
+
+    def counts(self) -> Dict[str, int]:
+        """ Number of jobs in each status """
+        with self._lock:
+            rows = self.connection.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status').fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,304 @@
+import os
+import time
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Dict, List, Iterable, Iterator
+from performance import Job, Sender, Retriever
+from structure import count_atoms
+
+
+# Columns of results/load-statistics.txt. Times are seconds since the start
+# of the run (client clock); created_at, started_at and ended_at are the
+# server timestamps as returned by /status.
+COLUMNS = ['pdb', 'id', 'n_atoms', 'probe_out', 'removal_distance', 'mode', 'rate', 'users', 'n_workers', 'scheduled', 'submitted', 'acknowledged', 'completed', 'latency', 'status', 'duplicate', 'created_at', 'started_at', 'ended_at']
+
+
+def constant(rate: float, n: int) -> np.ndarray:
+    """ Arrival offsets (s) of n jobs at a fixed rate (jobs/min) """
+    return np.arange(n) * 60.0 / rate
+
+
+def poisson(rate: float, n: int, rng: Optional[np.random.Generator]=None) -> np.ndarray:
+    """ Arrival offsets (s) of n jobs of a Poisson process with mean rate (jobs/min) """
+    rng = np.random.default_rng() if rng == None else rng
+    offsets = np.cumsum(rng.exponential(60.0 / rate, size=n))
+    return offsets - offsets[0] if n > 0 else offsets
+
+
+def burst(size: int, period: float, n: int) -> np.ndarray:
+    """ Arrival offsets (s) of n jobs sent `size` at a time every `period` seconds """
+    return (np.arange(n) // size) * period
+
+
+class LoadGenerator(object):
+    """ Submit jobs through a Sender with controlled arrivals and measure latency
+
+    open_loop() submits each job at its arrival time whether or not earlier
+    jobs have finished, so queueing at the server shows up as latency
+    instead of slowing down the client. closed_loop() keeps `users` jobs in
+    flight, each user submitting its next job when the previous one ends.
+
+    Completion is detected with batched POST /status requests every
+    `interval` seconds; latency is from the scheduled arrival until the job
+    was seen completed (or timed out). Results are not downloaded.
+    """
+
+    def __init__(self, sender: Sender, interval: float=1.0, workers: int=1, threads: int=32):
+        self.sender = sender
+        self.retriever = Retriever(sender.server, workers)
+        self.interval = interval
+        self.workers = workers
+        self.threads = threads
+
+        # id -> records waiting for completion
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._start = 0.0
+
+
+    def open_loop(self, jobs: Iterable[Job], arrivals: Iterable[float], mode: str='open', rate: Optional[float]=None, timeout: Optional[float]=None) -> pd.DataFrame:
+        """ Submit jobs[i] at start + arrivals[i] seconds and wait for all of them """
+        records = []
+        self._start = time.monotonic()
+        poller = self._poll_in_background()
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            for job, offset in zip(jobs, arrivals):
+                delay = self._start + offset - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                record = self._record(job, mode, rate=rate)
+                record['scheduled'] = float(offset)
+                records.append(record)
+                executor.submit(self._submit, job, record)
+
+        self._wait(records, timeout)
+        poller.set()
+        return self._frame(records)
+
+
+    def closed_loop(self, jobs: Iterable[Job], users: int, think_time: float=0.0, duration: Optional[float]=None, timeout: Optional[float]=None) -> pd.DataFrame:
+        """ `users` virtual users each submitting a job and waiting for it, until jobs run out (or duration s) """
+        records = []
+        jobs = iter(jobs)
+        lock = threading.Lock()
+        self._start = time.monotonic()
+        poller = self._poll_in_background()
+
+        def user():
+            while duration == None or self._now() < duration:
+                with lock:
+                    job = next(jobs, None)
+                if job == None:
+                    return
+                record = self._record(job, 'closed', users=users)
+                record['scheduled'] = self._now()
+                records.append(record)
+                self._submit(job, record)
+                if not record['done'].wait(timeout):
+                    return
+                time.sleep(think_time)
+
+        threads = [threading.Thread(target=user, daemon=True) for _ in range(users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._wait(records, timeout)
+        poller.set()
+        return self._frame(records)
+
+
+    def _record(self, job: Job, mode: str, rate: Optional[float]=None, users: Optional[int]=None) -> Dict[str, Any]:
+        record = dict.fromkeys(COLUMNS)
+        record.update({
+            'pdb': job.pdb,
+            'n_atoms': count_atoms(job.atoms),
+            'probe_out': job.input['settings']['probes']['probe_out'],
+            'removal_distance': job.input['settings']['cutoffs']['removal_distance'],
+            'mode': mode,
+            'rate': rate,
+            'users': users,
+            'n_workers': self.workers,
+            'duplicate': False,
+            'done': threading.Event(),
+        })
+        return record
+
+
+    def _submit(self, job: Job, record: Dict[str, Any]) -> None:
+        # Runs on the executor (open loop) or a user thread (closed loop),
+        # so a failed request must finish the record instead of raising
+        record['submitted'] = self._now()
+        try:
+            ok = self.sender._submit(job)
+        except Exception as e:
+            print(f"Submission of {job.pdb} failed: {type(e).__name__}: {e}")
+            record['acknowledged'] = self._now()
+            record['status'] = 'error'
+            record['done'].set()
+            return
+        record['acknowledged'] = self._now()
+        if not ok:
+            record['status'] = 'rejected'
+            record['done'].set()
+            return
+        record['id'] = job.id
+        # Same input already in queue: the server returned the existing job
+        record['duplicate'] = job.status != None
+        with self._lock:
+            self._pending.setdefault(job.id, []).append(record)
+
+
+    def _poll_in_background(self) -> threading.Event:
+        stop = threading.Event()
+
+        def poll():
+            while not stop.is_set():
+                with self._lock:
+                    ids = list(self._pending)
+                if len(ids) > 0:
+                    # Jobs stay pending when their status could not be
+                    # fetched and are checked again at the next interval
+                    try:
+                        statuses = self.retriever._get_statuses(ids)
+                    except Exception as e:
+                        print(f"Status check failed: {type(e).__name__}: {e}")
+                        statuses = {}
+                    now = self._now()
+                    for job_id in ids:
+                        self._update(job_id, statuses.get(job_id, {}), now)
+                stop.wait(self.interval)
+
+        threading.Thread(target=poll, daemon=True).start()
+        return stop
+
+
+    def _update(self, job_id: str, status: Optional[Dict[str, Any]], now: float) -> None:
+        if status != None and status.get('status') not in ['completed', 'timed_out']:
+            return
+        with self._lock:
+            records = self._pending.pop(job_id, [])
+        for record in records:
+            record['completed'] = now
+            record['latency'] = now - record['scheduled']
+            # Job not found in queue (expired or unknown)
+            record['status'] = status['status'] if status != None else 'not_found'
+            if status != None:
+                record.update({k: status[k] for k in ['created_at', 'started_at', 'ended_at']})
+            record['done'].set()
+
+
+    def _wait(self, records: List[Dict[str, Any]], timeout: Optional[float]) -> None:
+        deadline = None if timeout == None else time.monotonic() + timeout
+        for record in records:
+            remaining = None if deadline == None else max(0.0, deadline - time.monotonic())
+            record['done'].wait(remaining)
+
+
+    def _now(self) -> float:
+        return time.monotonic() - self._start
+
+
+    @staticmethod
+    def _frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+        return pd.DataFrame(records, columns=COLUMNS)
+
+
+def save(data: pd.DataFrame, fn: str='results/load-statistics.txt') -> None:
+    """ Append a run to the load statistics file """
+    data.to_csv(fn, sep='\t', index=False, mode='a', header=not os.path.exists(fn))
+
+
+def summarize(data: pd.DataFrame, slo: Optional[float]=None) -> Dict[str, float]:
+    """ Offered and achieved throughput (jobs/min) and latency percentiles (s) of a run """
+    done = data[data.status.isin(['completed', 'timed_out'])]
+    span = data.scheduled.max() - data.scheduled.min()
+    elapsed = done.completed.max() - data.scheduled.min() if len(done) > 0 else np.nan
+    summary = {
+        'jobs': len(data),
+        'completed': int((data.status == 'completed').sum()),
+        'offered': 60.0 * (len(data) - 1) / span if span > 0 else np.nan,
+        'throughput': 60.0 * len(done) / elapsed if elapsed > 0 else np.nan,
+        'p50': done.latency.quantile(0.50),
+        'p95': done.latency.quantile(0.95),
+        'p99': done.latency.quantile(0.99),
+    }
+    if slo != None:
+        # Unfinished jobs count as SLO misses
+        summary['slo'] = float((done.latency <= slo).sum()) / len(data) if len(data) > 0 else np.nan
+    return summary
+
+
+def capacity(generator: LoadGenerator, jobs: Iterator[Job], rates: Iterable[float], duration: float, slo: float, rng: Optional[np.random.Generator]=None) -> pd.DataFrame:
+    """ Run Poisson load at increasing rates (jobs/min) until p95 latency exceeds slo (s)
+
+    Each run uses `duration` seconds worth of new jobs from `jobs`, so that
+    no input is repeated (the server would return the earlier job).
+    Returns one summary row per rate; the last rate within the SLO is the
+    sustainable throughput for the current number of kv-workers.
+    """
+    rows = []
+    for rate in rates:
+        n = max(1, int(rate * duration / 60.0))
+        batch = [job for _, job in zip(range(n), jobs)]
+        data = generator.open_loop(batch, poisson(rate, len(batch), rng), mode='poisson', rate=rate, timeout=duration * 10)
+        save(data)
+        summary = dict(summarize(data, slo), rate=rate, n_workers=generator.workers)
+        rows.append(summary)
+        print(f"> {rate:g} jobs/min: throughput {summary['throughput']:.1f} jobs/min, p95 {summary['p95']:.1f} s")
+        if not summary['p95'] <= slo:
+            break
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    import itertools
+    from performance import Dataset
+
+    parser = argparse.ArgumentParser(description='Load generator for KVFinder-web')
+    parser.add_argument('--server', default='http://localhost:8081')
+    parser.add_argument('--mode', choices=['poisson', 'constant', 'burst', 'closed', 'capacity'], default='poisson')
+    parser.add_argument('--rate', type=float, default=60.0, help='jobs/min (poisson, constant)')
+    parser.add_argument('--burst-size', type=int, default=10)
+    parser.add_argument('--burst-period', type=float, default=60.0, help='seconds between bursts')
+    parser.add_argument('--users', type=int, default=4, help='virtual users (closed)')
+    parser.add_argument('--think-time', type=float, default=0.0, help='seconds between jobs of a user (closed)')
+    parser.add_argument('--jobs', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=300.0, help='seconds of load per rate (capacity)')
+    parser.add_argument('--rates', type=float, nargs='+', default=[15, 30, 60, 120, 240], help='jobs/min (capacity)')
+    parser.add_argument('--slo', type=float, default=60.0, help='p95 latency objective in seconds')
+    parser.add_argument('--workers', type=int, default=1, help='kv-workers running in the server (recorded only)')
+    args = parser.parse_args()
+
+    try:
+        os.mkdir('results')
+    except FileExistsError:
+        pass
+
+    # Every structure with every setting, each input used once
+    dataset = Dataset()
+    grid = [{'probes.probe_out': po, 'cutoffs.removal_distance': 2.4} for po in [4.0, 6.0, 8.0]]
+    grid += [{'probes.probe_out': 4.0, 'cutoffs.removal_distance': rd} for rd in [0.0, 0.6, 1.2]]
+    jobs = (job for pdb in dataset.pdb_list for job in dataset.job(pdb).sweep(grid))
+
+    generator = LoadGenerator(Sender(server=args.server), workers=args.workers)
+
+    if args.mode == 'capacity':
+        print(capacity(generator, jobs, args.rates, args.duration, args.slo).to_string(index=False))
+    else:
+        jobs = list(itertools.islice(jobs, args.jobs))
+        if args.mode == 'closed':
+            data = generator.closed_loop(jobs, args.users, args.think_time)
+        elif args.mode == 'burst':
+            data = generator.open_loop(jobs, burst(args.burst_size, args.burst_period, len(jobs)), mode='burst')
+        elif args.mode == 'constant':
+            data = generator.open_loop(jobs, constant(args.rate, len(jobs)), mode='constant', rate=args.rate)
+        else:
+            data = generator.open_loop(jobs, poisson(args.rate, len(jobs)), mode='poisson', rate=args.rate)
+        save(data)
+        print(summarize(data, args.slo))
@@ -0,0 +1,320 @@
+import json
+import time
+import socket
+import threading
+import collections
+import numpy as np
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Any, Dict, List, Tuple
+import validation
+from model import LinearModel, ELAPSED_TIME, JSON_SIZE, train, load
+from structure import read_atoms, count_atoms
+from tag import job_tag
+
+
+# kv-server rejects bodies above this size (web::JsonConfig limit)
+MAX_BODY_SIZE = 1_000_000
+# and POST /status requests with more ids than this
+MAX_BATCH_SIZE = 1000
+
+
+class Queue(object):
+    """ In-memory stand-in for ocypod's kvfinder queue and the kv-workers
+
+    Jobs are deduplicated by tag, go through queued -> running -> completed
+    (or timed_out) on `workers` threads, and are dropped `expires_after`
+    seconds after they end. Service times and output sizes are drawn from
+    the models (see model.py) and multiplied by `time_scale`.
+    """
+
+    def __init__(self, workers: int=1, timeout: float=1800.0, expires_after: float=86400.0, time_scale: float=1.0, elapsed_time: LinearModel=ELAPSED_TIME, json_size: LinearModel=JSON_SIZE, seed: Optional[int]=None):
+        self.timeout = timeout
+        self.expires_after = expires_after
+        self.time_scale = time_scale
+        self.elapsed_time = elapsed_time
+        self.json_size = json_size
+        self.rng = np.random.default_rng(seed)
+
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.pending: collections.deque = collections.deque()
+        self.lock = threading.Condition()
+        self.workers = 0
+        self._threads: List[threading.Thread] = []
+        self.scale(workers)
+
+
+    def scale(self, workers: int) -> None:
+        """ Change the number of workers (like docker-compose --scale kv-worker=N) """
+        with self.lock:
+            self.workers = workers
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), workers):
+                thread = threading.Thread(target=self._work, args=(i,), daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self.lock.notify_all()
+
+
+    def create(self, data: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """ Queue a job, or return the job already queued with the same tag """
+        tag = job_tag(data)
+        with self.lock:
+            self._expire()
+            if tag in self.jobs:
+                return tag, self._reply(tag, output=True)
+            settings = data["settings"]
+            atoms = read_atoms(data["pdb"])
+            n_atoms = count_atoms(atoms)
+            po, rd = settings["probes"]["probe_out"], settings["cutoffs"]["removal_distance"]
+            self.jobs[tag] = {
+                'status': 'queued',
+                'output': None,
+                'created_at': _now(),
+                'started_at': None,
+                'ended_at': None,
+                'service_time': float(self.elapsed_time.sample(n_atoms, po, rd, self.rng)[0]) * self.time_scale,
+                'output_size': int(self.json_size.sample(n_atoms, po, rd, self.rng)[0]),
+                'residues': _residues(atoms),
+            }
+            self.pending.append(tag)
+            self.lock.notify()
+        return tag, None
+
+
+    def get(self, tag: str, output: bool=True) -> Optional[Dict[str, Any]]:
+        """ Job as kv-server returns it, None if not in queue """
+        with self.lock:
+            self._expire()
+            if tag not in self.jobs:
+                return None
+            return self._reply(tag, output)
+
+
+    def stats(self) -> Dict[str, int]:
+        """ Number of jobs per status """
+        with self.lock:
+            return dict(collections.Counter(job['status'] for job in self.jobs.values()))
+
+
+    def _reply(self, tag: str, output: bool) -> Dict[str, Any]:
+        job = self.jobs[tag]
+        return {
+            'id': tag,
+            'status': job['status'],
+            'output': job['output'] if output else None,
+            'created_at': _format(job['created_at']),
+            'started_at': _format(job['started_at']),
+            'ended_at': _format(job['ended_at']),
+            'expires_after': f"{self.expires_after:g}s",
+        }
+
+
+    def _expire(self) -> None:
+        now = time.time()
+        for tag in [tag for tag, job in self.jobs.items() if job['ended_at'] != None and job['ended_at'] + self.expires_after < now]:
+            del self.jobs[tag]
+
+
+    def _work(self, index: int) -> None:
+        while True:
+            with self.lock:
+                while index < self.workers and len(self.pending) == 0:
+                    self.lock.wait()
+                if index >= self.workers:
+                    return
+                tag = self.pending.popleft()
+                job = self.jobs[tag]
+                job['status'] = 'running'
+                job['started_at'] = _now()
+
+            time.sleep(min(job['service_time'], self.timeout))
+
+            with self.lock:
+                job['ended_at'] = _now()
+                if job['service_time'] > self.timeout:
+                    job['status'] = 'timed_out'
+                else:
+                    job['status'] = 'completed'
+                    job['output'] = _output(tag, job['output_size'], job['residues'])
+
+
+class LocalServer(object):
+    """ Pure-Python stand-in for kv-server + ocypod + kv-workers
+
+    Serves /create, /{id}, /{id}/status and POST /status like kv-server,
+    backed by a Queue, so clients can be pointed at it without Docker.
+    """
+
+    def __init__(self, host: str='localhost', port: int=8081, **kwargs):
+        self.queue = Queue(**kwargs)
+        handler = type('Handler', (_Handler,), {'queue': self.queue})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        # Open (keep-alive) connections, closed by stop()
+        self.httpd.connections = set()
+        self._thread: Optional[threading.Thread] = None
+
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+    def start(self) -> None:
+        """ Serve in a background thread """
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        # Otherwise clients keep talking to this server over pooled connections
+        for connection in list(self.httpd.connections):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.httpd.server_close()
+        self.queue.scale(0)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    queue: Queue = None
+
+    def setup(self):
+        super().setup()
+        self.server.connections.add(self.connection)
+
+
+    def finish(self):
+        super().finish()
+        self.server.connections.discard(self.connection)
+
+
+    def log_message(self, format, *args):
+        pass
+
+
+    def do_GET(self):
+        path = self.path.strip('/').split('/')
+        if path == ['']:
+            return self._send(200, b'KVFinder Web', 'text/plain')
+        if len(path) == 2 and path[1] == 'status':
+            job = self.queue.get(path[0], output=False)
+        elif len(path) == 1:
+            job = self.queue.get(path[0])
+        else:
+            return self._send(404)
+        if job == None:
+            return self._send(404)
+        self._json(job)
+
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if len(body) > MAX_BODY_SIZE:
+            return self._send(400, b'Please update your plugin', 'text/plain')
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return self._send(400, b'Please update your plugin', 'text/plain')
+
+        if self.path == '/status':
+            # Body that does not deserialize into kv::Batch {ids: Vec<String>}
+            ids = data.get('ids') if isinstance(data, dict) else None
+            if not isinstance(ids, list) or not all(isinstance(tag, str) for tag in ids):
+                return self._send(400, b'Please update your plugin', 'text/plain')
+            if len(ids) > MAX_BATCH_SIZE:
+                return self._send(400, f'At most {MAX_BATCH_SIZE} ids per request'.encode(), 'text/plain')
+            return self._json({tag: self.queue.get(tag, output=False) for tag in ids})
+        if self.path != '/create':
+            return self._send(404)
+
+        try:
+            validation.check(data)
+        except ValueError as e:
+            return self._send(400, json.dumps(str(e)).encode(), 'text/plain')
+        except (KeyError, TypeError):
+            return self._send(400, b'Please update your plugin', 'text/plain')
+        tag, job = self.queue.create(data)
+        self._json(job if job != None else {'id': tag})
+
+
+    def _json(self, obj: Any) -> None:
+        self._send(200, json.dumps(obj).encode(), 'application/json')
+
+
+    def _send(self, code: int, body: bytes=b'', content_type: str='text/plain') -> None:
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _format(t: Optional[float]) -> Optional[str]:
+    if t == None:
+        return None
+    return datetime.fromtimestamp(t, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _residues(atoms: np.ndarray) -> List[List[str]]:
+    # Distinct residues of a structure as parKVFinder reports them: [resseq, chain, resname]
+    residues = dict.fromkeys(zip(atoms['resseq'].tolist(), atoms['chain'].tolist(), atoms['resname'].tolist()))
+    return [[str(resseq), chain, resname] for resseq, chain, resname in residues]
+
+
+def _output(tag: str, size: int, residues: List[List[str]]) -> Dict[str, str]:
+    # Synthetic parKVFinder output with a cavity PDB of about `size` bytes,
+    # the volume, area and (a few of the input's) residues of every cavity
+    line = 'HETATM{:5d}  HS  K{:>2s} A 259      {:6.3f}  {:6.3f}  {:6.3f}  1.00  0.00\n'
+    n_points = max(1, size // len(line.format(1, 'AA', 0.0, 0.0, 0.0)))
+    cavities = [chr(65 + i // 26) + chr(65 + i % 26) for i in range(min(max(1, n_points // 200), 26 * 26))]
+    pdb_kv = ''.join(line.format(i % 100000, cavities[i % len(cavities)], i % 50 * 0.6, i // 50 % 50 * 0.6, i // 2500 * 0.6) for i in range(n_points))
+    report = '# TOML results file for parKVFinder software\n\n'
+    report += 'title = "parKVFinder results file"\n\n'
+    report += '[FILES_PATH]\nINPUT = "./protein.pdb"\nLIGAND = "./ligand.pdb"\nOUTPUT = "./KV_Files/KVFinderWeb/KVFinderWeb.KVFinder.output.pdb"\n\n'
+    report += '[RESULTS]\n\n[RESULTS.VOLUME]\n' + ''.join(f'K{c} = {n_points / len(cavities) * 0.216:.2f}\n' for c in cavities)
+    report += '\n[RESULTS.AREA]\n' + ''.join(f'K{c} = {n_points / len(cavities) * 0.36 / 3:.2f}\n' for c in cavities)
+    report += '\n[RESULTS.RESIDUES]\n' + ''.join(f'K{c} = {json.dumps([residues[(i * 5 + k) % len(residues)] for k in range(min(5, len(residues)))])}\n' for i, c in enumerate(cavities))
+    log = f'Running parKVFinder for: {tag}\nDictionary: ./dictionary\nKVFinder-web stand-in\n'
+    return {'pdb_kv': pdb_kv, 'report': report, 'log': log}
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Local stand-in for the KVFinder-web server')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--workers', type=int, default=1, help='number of simulated kv-workers')
+    parser.add_argument('--time-scale', type=float, default=1.0, help='multiplies simulated service times')
+    parser.add_argument('--timeout', type=float, default=1800.0, help='job timeout in seconds')
+    parser.add_argument('--expires-after', type=float, default=86400.0, help='seconds a finished job stays available')
+    parser.add_argument('--fit', help='time statistics file to fit the service time model (default: built-in fit)')
+    parser.add_argument('--model', help='model artifact saved by Evaluator.runtime_model')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    models = {}
+    if args.model:
+        models = load(args.model)
+    if args.fit:
+        data = pd.read_table(args.fit, index_col=False)
+        models = train(data)
+
+    server = LocalServer(args.host, args.port, workers=args.workers, timeout=args.timeout, expires_after=args.expires_after, time_scale=args.time_scale, seed=args.seed, **models)
+    print(f"KVFinder-web stand-in listening on {server.url} with {args.workers} worker{'s' if args.workers > 1 else ''}")
+    print(f"Start PyMOL with KVFINDER_WEB_SERVER={server.url} to use it from the PyMOL plugin")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
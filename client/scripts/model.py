@@ -0,0 +1,93 @@
+import json
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+
+# Terms of the linear models, computed from n_atoms, probe_out and removal_distance
+TERMS = ['1', 'n_atoms', 'n_atoms * probe_out', 'n_atoms * removal_distance']
+
+
+def features(n_atoms: Any, probe_out: Any, removal_distance: Any) -> np.ndarray:
+    """ (n, len(TERMS)) design matrix """
+    n_atoms = np.asarray(n_atoms, dtype=np.float64)
+    probe_out = np.asarray(probe_out, dtype=np.float64)
+    removal_distance = np.asarray(removal_distance, dtype=np.float64)
+    n_atoms, probe_out, removal_distance = np.broadcast_arrays(n_atoms, probe_out, removal_distance)
+    return np.column_stack([np.ones(n_atoms.size), n_atoms.ravel(), (n_atoms * probe_out).ravel(), (n_atoms * removal_distance).ravel()])
+
+
+class LinearModel(object):
+    """ Linear model of a job quantity (e.g. elapsed_time) with log-normal noise
+
+    predict() gives the expected value for given n_atoms, probe_out and
+    removal_distance; sample() draws values around it with the spread of
+    the residuals seen when fitting.
+    """
+
+    def __init__(self, coefficients: List[float], sigma: float=0.0, minimum: float=0.0):
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.sigma = sigma
+        self.minimum = minimum
+
+
+    @classmethod
+    def fit(cls, data: Any, target: str, minimum: float=0.0):
+        """ Least squares fit to the n_atoms, probe_out, removal_distance and target columns of data """
+        X = features(data['n_atoms'], data['probe_out'], data['removal_distance'])
+        y = np.asarray(data[target], dtype=np.float64)
+        coefficients = np.linalg.lstsq(X, y, rcond=None)[0]
+        # Spread of log(observed / predicted) for the noise model
+        predicted = np.maximum(X @ coefficients, max(minimum, 1e-9))
+        positive = y > 0
+        sigma = float(np.std(np.log(y[positive] / predicted[positive]))) if positive.any() else 0.0
+        return cls(coefficients.tolist(), sigma, minimum)
+
+
+    def predict(self, n_atoms: Any, probe_out: Any, removal_distance: Any) -> np.ndarray:
+        return np.maximum(features(n_atoms, probe_out, removal_distance) @ self.coefficients, self.minimum)
+
+
+    def sample(self, n_atoms: Any, probe_out: Any, removal_distance: Any, rng: Optional[np.random.Generator]=None) -> np.ndarray:
+        rng = np.random.default_rng() if rng == None else rng
+        mean = self.predict(n_atoms, probe_out, removal_distance)
+        # Log-normal noise with mean 1
+        noise = rng.lognormal(-self.sigma ** 2 / 2, self.sigma, size=mean.shape)
+        return np.maximum(mean * noise, self.minimum)
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'terms': TERMS, 'coefficients': self.coefficients.tolist(), 'sigma': self.sigma, 'minimum': self.minimum}
+
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        if data.get('terms', TERMS) != TERMS:
+            raise ValueError(f"Model terms {data['terms']} differ from {TERMS}")
+        return cls(data['coefficients'], data.get('sigma', 0.0), data.get('minimum', 0.0))
+
+
+# Fitted to results/time-statistics.txt (24000 jobs of kv1000)
+ELAPSED_TIME = LinearModel([-0.2374, 4.585e-05, 1.342e-04, -2.922e-05], sigma=0.356, minimum=0.05)
+JSON_SIZE = LinearModel([-69544.0, 383.66, 46.457, -218.88], sigma=1.12, minimum=2000.0)
+
+
+def train(data: Any) -> Dict[str, LinearModel]:
+    """ Fit elapsed_time and json_size models to benchmark history (time-statistics.txt columns) """
+    return {
+        'elapsed_time': LinearModel.fit(data, 'elapsed_time', minimum=ELAPSED_TIME.minimum),
+        'json_size': LinearModel.fit(data, 'json_size', minimum=JSON_SIZE.minimum),
+    }
+
+
+def save(models: Dict[str, LinearModel], fn: str, **metadata) -> None:
+    """ Save models as a JSON artifact """
+    with open(fn, 'w') as f:
+        json.dump(dict(metadata, models={name: model.to_dict() for name, model in models.items()}), f, indent=2)
+
+
+def load(fn: Optional[str]=None) -> Dict[str, LinearModel]:
+    """ Models saved with save(), or the built-in ones if fn is None """
+    if fn == None:
+        return {'elapsed_time': ELAPSED_TIME, 'json_size': JSON_SIZE}
+    with open(fn) as f:
+        return {name: LinearModel.from_dict(model) for name, model in json.load(f)['models'].items()}
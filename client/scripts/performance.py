@@ -1,21 +1,54 @@
-import os, sys, toml, json, zlib, time
-import requests
-import dateutil.parser
+import os, io, toml, time, copy, struct, shutil
 import pandas as pd
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Callable, Dict, List, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from zipfile import ZipFile, ZIP_STORED
 from math import ceil, floor
+import requests
+from transport import connect
+from cache import ResultCache
+from store import ResultStore
+from jobstore import JobStore, PENDING
+from tag import body_tag, encode, encode_settings, encode_structure, member_sizes
+from sweep import Grid, variants
+from stream import ReplyStream, FIELD_PATHS
+from structure import read_atoms, count_atoms, bounding_box
+import model
+import validation
+import crop
+
+
+# Time columns of time-statistics.txt (worker_time is the time spent in queue)
+# and the percentiles reported for them
+TIMES = ['total_time', 'elapsed_time', 'worker_time']
+QUANTILES = [0.5, 0.9, 0.95, 0.99]
+# Server timestamps of a job, kept as returned (ISO 8601 strings)
+TIMESTAMPS = ['created_at', 'started_at', 'ended_at']
+# Request and reply members whose encoded (<field>_size) and gzip
+# (<field>_compressed) bytes are recorded; response_wire is the reply
+# bytes actually received (less than response_size when sent compressed)
+PAYLOAD_FIELDS = ['request', 'settings', 'pdb', 'pdb_ligand', 'response', 'pdb_kv', 'report', 'log']
+PAYLOAD = [f'{field}_{kind}' for field in PAYLOAD_FIELDS for kind in ['size', 'compressed']] + ['response_wire']
+# Columns of time-statistics.txt
+STATISTICS = ['pdb', 'id', 'n_atoms', *TIMES, 'json_size', 'probe_out', 'removal_distance', 'n_workers', *TIMESTAMPS, *PAYLOAD]
+# Largest request body accepted by kv-server and job reply stored by ocypod (bytes)
+REQUEST_LIMIT = 1_000_000
+RESPONSE_LIMIT = 10 * 2 ** 20
         
 
 class Job(object):
     """ Create KVFinder-web job """
 
-    def __init__(self, pdb: str, ligand_pdb: Optional[str]=None, probe_out: float=4.0, removal_distance: float=2.4):
+    def __init__(self, pdb: str, ligand_pdb: Optional[str]=None, probe_out: float=4.0, removal_distance: float=2.4, lines: Optional[List[str]]=None, archive: Optional[str]=None):
         # Job Information (local)
         self.status: Optional[str] = None
         self.pdb: Optional[str] = pdb
+        # Zip archive containing pdb (see Dataset), None for files on disk
+        self.archive: Optional[str] = archive
         self.ligand: Optional[str] = ligand_pdb if ligand_pdb != None else None
         self.output_directory: Optional[str] = None
         self.base_name: Optional[str] = None
@@ -25,14 +58,56 @@ class Job(object):
         self.id: Optional[str] = None
         self.input: Optional[Dict[str, Any]] = {} 
         self.output: Optional[Dict[str, Any]] = None
+        self.output_size: Optional[int] = None
+        # PAYLOAD columns measured so far (request when sent, reply when retrieved)
+        self.payload: Dict[str, int] = {}
+
+        # Parsed ATOM/HETATM records (see structure.read_atoms)
+        self.atoms: Optional[np.ndarray] = None
+        self.ligand_atoms: Optional[np.ndarray] = None
+        # (pdb, pdb_ligand, encoded structure), shared by sweep variants
+        self._structure: Optional[tuple] = None
         
         # Fill parameters and inputs
         self._default_settings(probe_out, removal_distance)
-        self._add_pdb(pdb)
+        self._add_pdb(pdb, lines=lines)
         if ligand_pdb != None:
             self._add_pdb(ligand_pdb, is_ligand=True)
 
 
+    @property
+    def tag(self) -> str:
+        return body_tag(self.body())
+
+
+    def body(self) -> bytes:
+        """ JSON request body, encoding the pdb lines only once per structure """
+        return encode(encode_settings(self.input["settings"]), self._encoded_structure()).encode("utf-8")
+
+
+    def _encoded_structure(self) -> str:
+        pdb, pdb_ligand = self.input["pdb"], self.input.get("pdb_ligand")
+        if self._structure == None or self._structure[0] is not pdb or self._structure[1] is not pdb_ligand:
+            self._structure = (pdb, pdb_ligand, encode_structure(pdb, pdb_ligand))
+        return self._structure[2]
+
+
+    def sweep(self, grid: Grid) -> List["Job"]:
+        """ One job per distinct combination of settings in grid, all sharing this structure """
+        jobs = []
+        self._encoded_structure()
+        for settings in variants(self.input["settings"], grid):
+            job = copy.copy(self)
+            job.id = None
+            job.output = None
+            job.output_size = None
+            # Sizes are recorded per variant (copy.copy would share the dict)
+            job.payload = {}
+            job.input = dict(self.input, settings=settings)
+            jobs.append(job)
+        return jobs
+
+
     @property
     def cavity(self) -> Optional[Dict[str, Any]]:
         if self.output == None:
@@ -57,13 +132,43 @@ class Job(object):
             return self.output["output"]["log"]
 
 
-    def _add_pdb(self, pdb_fn: str, is_ligand: bool=False) -> None:
-        with open(pdb_fn) as f:
-            pdb = f.readlines()
+    def estimate_runtime(self, runtime_model: Optional[model.LinearModel]=None) -> float:
+        """ Expected parKVFinder run time (s) of this job, without queue time """
+        runtime_model = model.ELAPSED_TIME if runtime_model == None else runtime_model
+        settings = self.input["settings"]
+        return float(runtime_model.predict(count_atoms(self.atoms), settings["probes"]["probe_out"], settings["cutoffs"]["removal_distance"])[0])
+
+
+    def check(self) -> None:
+        """ Raise ValueError if KVFinder-web would reject this job """
+        validation.check(self.input, self.atoms)
+
+
+    def crop(self, padding: float=2.0) -> int:
+        """ Drop atoms outside the ligand/box search space, return number of atoms removed """
+        pdb = crop.crop(self.input, self.atoms, self.ligand_atoms, padding)
+        if pdb == None:
+            return 0
+        n_atoms = len(self.atoms)
+        self.input["pdb"] = pdb
+        self.atoms = read_atoms(pdb)
+        return n_atoms - len(self.atoms)
+
+
+    def _add_pdb(self, pdb_fn: str, is_ligand: bool=False, lines: Optional[List[str]]=None) -> None:
+        if lines != None:
+            pdb = lines
+        elif self.archive != None and not is_ligand:
+            pdb = read_member(self.archive, pdb_fn)
+        else:
+            with open(pdb_fn) as f:
+                pdb = f.readlines()
         if is_ligand:
             self.input["pdb_ligand"] = pdb
+            self.ligand_atoms = read_atoms(pdb)
         else:
             self.input["pdb"] = pdb
+            self.atoms = read_atoms(pdb)
 
 
     def save(self, id: int) -> None:
@@ -88,11 +193,16 @@ class Job(object):
                 f.write(f"pdb = \"{self.pdb}\"\n")
             if self.ligand is not None:
                 f.write(f"ligand = \"{self.ligand}\"\n")
+            if self.archive is not None:
+                f.write(f"archive = \"{self.archive}\"\n")
             f.write(f"output = \"{self.output_directory}\"\n")
             f.write(f"base_name = \"{self.base_name}\"\n")
             f.write('\n')
             toml.dump(o=self.input['settings'], f=f)
             f.write('\n')
+            if len(self.payload) > 0:
+                toml.dump(o={'payload': self.payload}, f=f)
+                f.write('\n')
 
 
     @classmethod
@@ -104,14 +214,17 @@ class Job(object):
 
         pdb = job['files']['pdb']
         ligand_pdb = job['files']['ligand'] if 'ligand' in job['files'].keys() else None
+        archive = job['files']['archive'] if 'archive' in job['files'].keys() else None
         removal_distance = job['cutoffs']['removal_distance']
         probe_out = job['probes']['probe_out']
 
-        return cls(pdb, ligand_pdb, probe_out, removal_distance)
+        loaded = cls(pdb, ligand_pdb, probe_out, removal_distance, archive=archive)
+        loaded.payload = job.get('payload', {})
+        return loaded
 
     
-    def export(self) -> None:
-        # Prepare base file
+    def prepare_export(self) -> str:
+        """ Create output directory and return the cavity file name """
         base_dir = os.path.join(self.output_directory, self.id)
 
         try:
@@ -119,10 +232,18 @@ class Job(object):
         except FileExistsError:
             pass
 
-        # Export cavity
-        cavity_fn = os.path.join(base_dir, f'{self.base_name}.KVFinder.output.pdb')
-        with open(cavity_fn, 'w') as f:
-            f.write(self.cavity)
+        return os.path.join(base_dir, f'{self.base_name}.KVFinder.output.pdb')
+
+
+    def export(self) -> None:
+        # Prepare base file
+        base_dir = os.path.join(self.output_directory, self.id)
+        cavity_fn = self.prepare_export()
+
+        # Export cavity (unless already streamed to cavity_fn)
+        if self.cavity != None:
+            with open(cavity_fn, 'w') as f:
+                f.write(self.cavity)
 
         # Export report
         report_fn = os.path.join(base_dir, f'{self.base_name}.KVFinder.results.toml')
@@ -203,158 +324,524 @@ class Job(object):
 
 
 class Dataset(object):
-
-    def __init__(self, filename: str="kv1000.zip", dirname: str="", is_zip=True):
+    """ PDB files of a benchmark dataset, read straight from its zip archive
+
+    Members are never extracted: each one is decompressed when read, or,
+    with mmap=True, sliced from a memory-mapped uncompressed copy of the
+    archive (<name>.stored.zip, written once if the archive is compressed).
+    An index with the number of atoms and bounding box of every member is
+    built on first use and kept next to the archive (<name>.index.tsv).
+    With is_zip=False the files are read from dirname + filename without
+    .zip instead.
+    """
+
+    def __init__(self, filename: str="kv1000.zip", dirname: str="", is_zip=True, mmap: bool=False):
+        self.filename = filename
+        self.is_zip = is_zip
         # Prepare dirname
-        dirname = dirname + filename.replace('.zip', '')
-        # Unzip files
-        if is_zip:
-            self.unzip(filename, dirname)
+        self.dirname = dirname + filename.replace('.zip', '')
+        self._zip: Optional[ZipFile] = None
+        self._map: Optional[Any] = None
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+
         # Get pdb list
-        self.pdb_list = self.get_pdb_list(dirname)
+        if is_zip:
+            self._zip = ZipFile(filename, 'r')
+            names = self._zip.namelist()
+            if mmap:
+                self._open_map()
+        else:
+            names = [os.path.join(self.dirname, fn) for fn in os.listdir(self.dirname)]
+        self.pdb_list = sorted([name for name in names if name.endswith('.pdb')])
+
         # Get statistics
-        self.stats = self.get_statistics(dirname)
+        self.stats = self.get_statistics()
+        self._index: Optional[pd.DataFrame] = None
 
-    @staticmethod
-    def unzip(filename, dirname):
-        from zipfile import ZipFile
 
-        if not os.path.isdir(dirname):
-            with ZipFile(filename, 'r') as f:
-                f.extractall()
+    def read(self, name: str) -> List[str]:
+        """ Lines of a member, like readlines() of the extracted file """
+        if not self.is_zip:
+            with open(name) as f:
+                return f.readlines()
+        if self._map != None:
+            start, size = self._offsets[name]
+            return _readlines(io.BytesIO(self._map[start:start + size]))
+        with self._zip.open(name) as f:
+            return _readlines(f)
 
-    @staticmethod
-    def get_pdb_list(dirname):       
-        return sorted([os.path.join(dirname, pdb) for pdb in os.listdir(dirname) if pdb.endswith('.pdb')])
 
-    @staticmethod
-    def get_statistics(dirname):
-        from pandas import read_csv
-        return read_csv(os.path.join(dirname, 'statistics.txt'), sep='\t')
+    def __iter__(self) -> Iterator[Tuple[str, List[str]]]:
+        for name in self.pdb_list:
+            yield name, self.read(name)
+
+
+    def job(self, name: str, **kwargs) -> Job:
+        """ Job for a member, with its lines already read from the archive """
+        return Job(pdb=name, lines=self.read(name), archive=self.filename if self.is_zip else None, **kwargs)
+
+
+    def jobs(self, names: Optional[List[str]]=None, **kwargs) -> Iterator[Job]:
+        for name in (self.pdb_list if names == None else names):
+            yield self.job(name, **kwargs)
+
+
+    @property
+    def index(self) -> pd.DataFrame:
+        """ name, n_atoms and bounding box (xmin ... zmax) of every member """
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+
+    def random(self, n: int, seed: Optional[int]=None) -> List[str]:
+        """ n members chosen at random """
+        rng = np.random.default_rng(seed)
+        names = rng.choice(self.pdb_list, size=min(n, len(self.pdb_list)), replace=False)
+        return sorted(names.tolist())
+
+
+    def stratified(self, n: int, strata: int=4, seed: Optional[int]=None) -> List[str]:
+        """ n members with about the same number from each atom count quantile """
+        rng = np.random.default_rng(seed)
+        index = self.index
+        bins = pd.qcut(index['n_atoms'].rank(method='first'), strata, labels=False)
+        names = []
+        for i, (_, group) in enumerate(index.groupby(bins)):
+            # Spread the remainder over the first strata
+            size = min(n // strata + (1 if i < n % strata else 0), len(group))
+            names += rng.choice(group['name'].to_numpy(), size=size, replace=False).tolist()
+        return sorted(names)
+
+
+    def get_statistics(self) -> Optional[pd.DataFrame]:
+        fn = os.path.join(self.dirname, 'statistics.txt')
+        if self.is_zip:
+            if fn not in self._zip.namelist():
+                return None
+            with self._zip.open(fn) as f:
+                return pd.read_csv(f, sep='\t')
+        return pd.read_csv(fn, sep='\t')
+
+
+    def _index_fn(self) -> str:
+        return self.filename + '.index.tsv' if self.is_zip else os.path.join(self.dirname, 'index.tsv')
+
+
+    def _load_index(self) -> pd.DataFrame:
+        fn = self._index_fn()
+        source = self.filename if self.is_zip else self.dirname
+        if os.path.exists(fn) and os.path.getmtime(fn) >= os.path.getmtime(source):
+            index = pd.read_table(fn)
+            if index['name'].tolist() == self.pdb_list:
+                return index
+
+        # Parse every member once
+        rows = []
+        for name, lines in self:
+            atoms = read_atoms(lines)
+            row = {'name': name, 'n_atoms': count_atoms(atoms)}
+            if len(atoms) > 0:
+                lower, upper = bounding_box(atoms)
+                row.update(dict(zip(['xmin', 'ymin', 'zmin', 'xmax', 'ymax', 'zmax'], np.concatenate([lower, upper]).tolist())))
+            rows.append(row)
+        index = pd.DataFrame(rows, columns=['name', 'n_atoms', 'xmin', 'ymin', 'zmin', 'xmax', 'ymax', 'zmax'])
+        try:
+            index.to_csv(fn, sep='\t', index=False)
+        except OSError:
+            pass
+        return index
+
+
+    def _open_map(self) -> None:
+        import mmap
+
+        # Members must be stored uncompressed to be sliced from the map
+        fn = self.filename
+        if any(info.compress_type != ZIP_STORED for info in self._zip.infolist()):
+            fn = self.filename.replace('.zip', '') + '.stored.zip'
+            if not os.path.exists(fn) or os.path.getmtime(fn) < os.path.getmtime(self.filename):
+                with ZipFile(fn + '.tmp', 'w', ZIP_STORED) as out:
+                    for info in self._zip.infolist():
+                        with self._zip.open(info) as src, out.open(info.filename, 'w') as dst:
+                            shutil.copyfileobj(src, dst)
+                os.replace(fn + '.tmp', fn)
+
+        with open(fn, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with ZipFile(fn, 'r') as stored:
+            for info in stored.infolist():
+                # Data starts after the local file header (30 bytes + name + extra field)
+                name_length, extra_length = struct.unpack('<HH', self._map[info.header_offset + 26:info.header_offset + 30])
+                self._offsets[info.filename] = (info.header_offset + 30 + name_length + extra_length, info.file_size)
+
+
+def read_member(archive: str, name: str) -> List[str]:
+    """ Lines of a file in a zip archive """
+    with ZipFile(archive, 'r') as zf, zf.open(name) as f:
+        return _readlines(f)
+
+
+def _readlines(f) -> List[str]:
+    # Same decoding and newline handling as open(fn).readlines()
+    return io.TextIOWrapper(f).readlines()
+
+
+def _payload(sizes: Dict[str, int], compressed: Dict[str, int]) -> Dict[str, int]:
+    # PAYLOAD columns of measured sizes, by member name
+    columns = {f'{field}_size': size for field, size in sizes.items()}
+    columns.update({f'{field}_compressed': size for field, size in compressed.items()})
+    return columns
+
+
+def _migrate_statistics(fn: str) -> List[str]:
+    """ Columns of a time statistics file, adding the STATISTICS columns it lacks
+
+    Files written before timestamps and payload sizes were kept are
+    rewritten once with the missing columns left empty in earlier rows.
+    """
+    with open(fn) as f:
+        columns = f.readline().rstrip('\n').split('\t')
+    missing = [column for column in STATISTICS if column not in columns]
+    if len(missing) == 0:
+        return columns
+
+    print(f"> Adding columns {', '.join(missing)} to {fn}")
+    # Line by line, so earlier values are written back unchanged
+    tmp_fn = f'{fn}.{os.getpid()}.tmp'
+    with open(fn) as f, open(tmp_fn, 'w') as out:
+        out.write('\t'.join(columns + missing) + '\n')
+        next(f)
+        for line in f:
+            out.write(line.rstrip('\n') + '\t' * len(missing) + '\n')
+    os.replace(tmp_fn, fn)
+    return columns + missing
 
 
 class Sender(object):
 
-    def __init__(self, server: str="http://localhost:8081"):
+    def __init__(self, server: str="http://localhost:8081", cache: Optional[ResultCache]=None):
         # Define server
         self.server = f"{server}"
+        self.transport = connect(self.server)
 
-        # Create ./KVFinder-web directory for jobs
-        try: 
-            os.mkdir('.KVFinder-web')
-        except FileExistsError:
-            pass
+        # Completed results by job tag, checked before submitting
+        self.cache = cache
+
+        # Submitted jobs (./.KVFinder-web/jobs.db)
+        self.jobs = JobStore()
 
         # Create time statistics file
         if not os.path.exists('results/time-statistics.txt'):
             with open('results/time-statistics.txt', 'w') as f:
-                f.write('pdb\tid\tn_atoms\ttotal_time\telapsed_time\tworker_time\tjson_size\tprobe_out\tremoval_distance\tn_workers\n')
+                f.write('\t'.join(STATISTICS) + '\n')
 
     def run(self, job: Job):
+        if self._from_cache(job):
+            return
         if self._submit(job):
             # Save job
             job.status = 'queued'
-            job.save(job.id)
+            self.jobs.add(job)
         return
 
+    def run_many(self, jobs: List[Job], runtime_model: Optional[model.LinearModel]=None) -> None:
+        """ Run jobs shortest (estimated run time) first, so long jobs do not hold up short ones """
+        for job in sorted(jobs, key=lambda job: job.estimate_runtime(runtime_model)):
+            self.run(job)
+
+    def _from_cache(self, job) -> bool:
+        if self.cache == None:
+            return False
+        tag = job.tag
+        f = self.cache.open(tag)
+        if f == None:
+            return False
+        # Export cached results without any request
+        job.id = tag
+        job.output_directory = 'results'
+        job.base_name = job.id
+        with f, open(job.prepare_export(), 'wb') as cavity:
+            job.output = ReplyStream(iter(lambda: f.read(65536), b''), cavity).read()
+        job.status = job.output['status']
+        job.export()
+        return True
+
     def _submit(self, job) -> bool:
-        r = requests.post(self.server + '/create', json=job.input)
+        # Reject invalid jobs before uploading them
+        try:
+            job.check()
+        except ValueError as e:
+            with open('results/erros.log', 'a+') as log:
+                log.write(f"\n>{job.pdb}\n")
+                log.write(f"Probe Out: {job.input['settings']['probes']['probe_out']}\n")
+                log.write(f"Removal Distance: {job.input['settings']['cutoffs']['removal_distance']}\n")
+                log.write(f"{e}\n")
+            print("Invalid job:", e)
+            return False
+
+        body = job.body()
+        r = self.transport.post('/create', data=body, headers={'Content-Type': 'application/json'})
         if r.ok:
-            job.id = r.json()['id']
+            reply = r.json()
+            job.id = reply['id']
+            job.payload.update(_payload(*member_sizes(body, compress=True)))
+            # Status is only sent back when the input was already in queue
+            job.status = reply.get('status')
             job.output_directory = 'results'
             job.base_name = job.id
             return True
         else:
             # Write in erros.log
             with open('results/erros.log', 'a+') as log:
-                log.write(f"\n>{pdb}\n")
+                log.write(f"\n>{job.pdb}\n")
                 log.write(f"Probe Out: {job.input['settings']['probes']['probe_out']}\n")
                 log.write(f"Removal Distance: {job.input['settings']['cutoffs']['removal_distance']}\n")
-                log.write(r)     
+                log.write(str(r) + '\n')
             print("Debug:", r)
             return False
 
 
 class Retriever(object):
 
-    def __init__(self, server: str="http://localhost:8081", workers:int=1):
+    def __init__(self, server: str="http://localhost:8081", workers:int=1, cache: Optional[ResultCache]=None, store: Optional[ResultStore]=None, threads: int=4, retries: int=3, callback: Optional[Callable[[Job], None]]=None, progress: Optional[Callable[[int, int, int], None]]=None):
         # Define server
         self.server = f"{server}"
+        self.transport = connect(self.server)
+
+        # Completed results by job tag, filled as jobs are retrieved
+        self.cache = cache
+
+        # Jobs submitted by Sender (./.KVFinder-web/jobs.db)
+        self.jobs = JobStore()
+
+        # Time statistics go to the result store if given, otherwise to
+        # results/time-statistics.txt
+        self.store = store
         
         # Register number of workers in KVFinder-web server
         self.workers = workers
-    
-    def start(self):
 
-        # Get job IDs
-        jobs = self._get_jobs()        
-        
-        while len(jobs) > 0:
-            
-            msg = f'> Checking {len(jobs)} jobs!'
-            print(msg, end='', flush=True)
-            
-            for job_id in jobs:
-                
-                # Get job information
-                job_fn = os.path.join('.KVFinder-web', job_id, 'job.toml')
-
-                # Prepare job
-                job = Job.load(fn=job_fn)
-                job.id = job_id
-                job.output_directory = 'results'
-                job.base_name = job.id
-
-                # Get results
-                if self._get_results(job):
-                    # total_time
-                    total_time = dateutil.parser.parse(job.output['ended_at']) - dateutil.parser.parse(job.output['created_at'])
-                    total_time = f'{total_time.total_seconds():4f}'
-                    # elapsed_time
-                    elapsed_time = dateutil.parser.parse(job.output['ended_at']) - dateutil.parser.parse(job.output['started_at'])
-                    elapsed_time = f"{elapsed_time.total_seconds():4f}"
-                    # worker_time
-                    worker_time = dateutil.parser.parse(job.output['started_at']) - dateutil.parser.parse(job.output['created_at'])
-                    worker_time = f"{worker_time.total_seconds():4f}"
-                    # json_size
-                    json_size = sys.getsizeof(json.dumps(job.output))
-                    # n_atoms
-                    n_atoms = get_number_of_atoms(job.pdb)
-                    # po
-                    po = job.input['settings']['probes']['probe_out']
-                    # rd 
-                    rd = job.input['settings']['cutoffs']['removal_distance']
-                    
-                    # Save statistics
-                    with open('results/time-statistics.txt', 'a+') as out:
-                        out.write(f'{job.pdb}\t{job.id}\t{n_atoms}\t{total_time}\t{elapsed_time}\t{worker_time}\t{json_size}\t{po}\t{rd}\t{self.workers}\n')
-
-                    # Remove job from jobs list
+        # Threads downloading and exporting results; callback(job) is
+        # called from start() for each job retrieved and progress(retrieved,
+        # total, exporting) after every pass
+        self.threads = threads
+        # Jobs that fail to be retrieved this many times are marked failed
+        self.retries = retries
+        self.callback = callback
+        self.progress = progress if progress != None else self.print_progress
+    
+    def start(self, interval: float=5.0):
+        """ Retrieve every pending job, checking their status every `interval` seconds
+
+        Completed jobs are downloaded and exported on a pool of `threads`
+        threads while the status of the others keeps being checked;
+        statistics and job status changes are saved from this thread.
+        """
+        # Get IDs of jobs not retrieved yet
+        jobs = self.jobs.ids(PENDING)
+        total = len(jobs)
+        done = 0
+        # Jobs being downloaded and exported, by id
+        in_flight: Dict[str, Future] = {}
+        # Failed retrievals and status checks of each job
+        failures: Dict[str, int] = {}
+        next_check = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            while len(jobs) > 0:
+                rows = []
+                # New status of each job, saved at once
+                changes = {}
+
+                # Results of exports finished since the last pass
+                for job_id in [job_id for job_id, future in in_flight.items() if future.done()]:
+                    job, row = in_flight.pop(job_id).result()
+                    if job == None:
+                        # Retried at the next status check, up to `retries` times
+                        failures[job_id] = failures.get(job_id, 0) + 1
+                        if failures[job_id] < self.retries:
+                            continue
+                        changes[job_id] = 'failed'
+                        jobs.remove(job_id)
+                        done += 1
+                        continue
+                    # Timed out jobs have no statistics
+                    if row != None:
+                        rows.append(row)
+                    changes[job_id] = job.status
                     jobs.remove(job_id)
+                    done += 1
+                    if self.callback != None:
+                        self.callback(job)
+
+                if time.monotonic() >= next_check:
+                    next_check = time.monotonic() + interval
+
+                    # Get status of every job not being exported in one request
+                    waiting = [job_id for job_id in jobs if job_id not in in_flight]
+                    statuses = self._get_statuses(waiting)
+
+                    for job_id in waiting:
+
+                        status = statuses.get(job_id, {})
+
+                        # Job not found in queue (expired or unknown)
+                        if status == None:
+                            with open('results/thread.log', 'a+') as f:
+                                f.write(f">{job_id}\n")
+                                f.write("Not found\n")
+                            changes[job_id] = 'not_found'
+                            jobs.remove(job_id)
+                            done += 1
+                            continue
+
+                        if status.get('status') in ['completed', 'timed_out']:
+                            in_flight[job_id] = executor.submit(self._retrieve, job_id)
+                        elif status.get('status') in PENDING:
+                            changes[job_id] = status['status']
+                        elif 'status' not in status:
+                            # Status request failed (logged by _get_statuses),
+                            # checked again at the next pass, up to `retries` times
+                            failures[job_id] = failures.get(job_id, 0) + 1
+                            if failures[job_id] >= self.retries:
+                                changes[job_id] = 'failed'
+                                jobs.remove(job_id)
+                                done += 1
+
+                # Save statistics and job status changes of this pass at once
+                self._save_statistics(rows)
+                self.jobs.update(changes)
+                self.progress(done, total, len(in_flight))
+
+                # Sleep until the next status check or an export finishes
+                if len(jobs) > 0:
+                    timeout = max(0.0, next_check - time.monotonic())
+                    if len(in_flight) > 0:
+                        wait(in_flight.values(), timeout=timeout, return_when=FIRST_COMPLETED)
+                    else:
+                        time.sleep(timeout)
+
+        if self.store != None:
+            self.store.close()
+
+
+    def _retrieve(self, job_id: str) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        # Download and export a finished job, returns it and its statistics row
+        # (None for timed out jobs), or (None, None) if retrieval failed
+        try:
+            job = self.jobs.load(job_id)
+            job.output_directory = 'results'
+            job.base_name = job.id
+            if not self._get_results(job):
+                return None, None
+            if job.status != 'completed':
+                return job, None
+
+            # json_size
+            json_size = job.output_size
+            # n_atoms
+            n_atoms = count_atoms(job.atoms)
+            # po
+            po = job.input['settings']['probes']['probe_out']
+            # rd 
+            rd = job.input['settings']['cutoffs']['removal_distance']
+
+            # Statistics row (times are computed from timestamps when saved)
+            row = {'pdb': job.pdb, 'id': job.id, 'n_atoms': n_atoms, 'json_size': json_size, 'probe_out': po, 'removal_distance': rd, 'n_workers': self.workers, **{t: job.output[t] for t in TIMESTAMPS}, **{c: job.payload.get(c) for c in PAYLOAD}}
+        except Exception as e:
+            with open('results/thread.log', 'a+') as f:
+                f.write(f">{job_id}\n")
+                f.write(f"{type(e).__name__}: {e}\n")
+            return None, None
 
-                time.sleep(1)
+        # Results are in files now
+        job.output = None
+        return job, row
 
-            print(len(msg) * '\b', end='', flush=True)
+
+    @staticmethod
+    def print_progress(done: int, total: int, exporting: int) -> None:
+        msg = f'> Retrieved {done}/{total} jobs ({exporting} exporting)'
+        print(msg + len(msg) * '\b', end='', flush=True)
+
+
+    def _save_statistics(self, rows: List[Dict[str, Any]]) -> None:
+        if len(rows) == 0:
+            return
+        # total_time, elapsed_time and worker_time of every row at once
+        data = pd.DataFrame(rows)
+        created_at, started_at, ended_at = [pd.to_datetime(data[t], utc=True) for t in TIMESTAMPS]
+        data['total_time'] = (ended_at - created_at).dt.total_seconds()
+        data['elapsed_time'] = (ended_at - started_at).dt.total_seconds()
+        data['worker_time'] = (started_at - created_at).dt.total_seconds()
+
+        if self.store != None:
+            self.store.extend(data.to_dict('records'))
+        else:
+            columns = _migrate_statistics('results/time-statistics.txt')
+            data = data.reindex(columns=columns)
+            for column in TIMES:
+                data[column] = data[column].map('{:4f}'.format)
+            data.to_csv('results/time-statistics.txt', sep='\t', mode='a', header=False, index=False)
+
+
+    def _get_statuses(self, job_ids: list, batch_size: int=500) -> Dict[str, Optional[Dict[str, Any]]]:
+        """ Get status of many jobs (without output) with one request per batch
+
+        Ids of a batch that failed get {'error': reason} instead of a status.
+        """
+        statuses = {}
+        for i in range(0, len(job_ids), batch_size):
+            batch = job_ids[i:i + batch_size]
+            try:
+                r = self.transport.post('/status', json={'ids': batch})
+            except requests.RequestException as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if r.ok:
+                    statuses.update(r.json())
+                    continue
+                error = f"{r}: {r.text}"
+            with open('results/thread.log', 'a+') as f:
+                f.write(">status\n")
+                f.write(error + '\n')
+            statuses.update({job_id: {'error': error} for job_id in batch})
+        return statuses
 
 
     def _get_results(self, job) -> Optional[Dict[str, Any]]:
-        
-        r = requests.get(self.server + '/' + job.id)
-                
+
+        # Download output only once, after completion
+        r = self.transport.get('/' + job.id, stream=True)
+
         if r.ok:
-            reply = r.json()
-            if reply['status'] == 'completed' or reply['status'] == 'timed_out':
-                # Pass output to job class
-                job.output = reply
-                job.status = reply['status']
+            # Stream cavity to disk (and raw reply to cache) as it arrives
+            cache_fn = self.cache.temporary(job.tag) if self.cache != None else os.devnull
+            with r, open(job.prepare_export(), 'wb') as cavity, open(cache_fn, 'wb') as tee:
+                reply = ReplyStream(r.iter_content(65536), cavity, tee, fields=FIELD_PATHS, compress=True)
+                job.output = reply.read()
+                job.output_size = reply.size
+                # Bytes received, before any Content-Encoding is decoded
+                job.payload.update(_payload(dict(reply.sizes, response=reply.size), reply.compressed), response_wire=r.raw.tell())
+            if self.cache != None:
+                if job.output['status'] == 'completed':
+                    self.cache.put_file(job.tag, cache_fn)
+                else:
+                    os.remove(cache_fn)
+
+            if job.output['status'] == 'completed':
+                # Pass status to job class
+                job.status = job.output['status']
 
                 # Export results
                 job.export()
-                
-                # Remove job directory
-                job_dn = os.path.join('.KVFinder-web', job.id)
-                self.erase_job_dir(job_dn)
 
+                return True
+            elif job.output['status'] == 'timed_out':
+                # No output to export
+                job.status = job.output['status']
+                os.remove(job.prepare_export())
                 return True
         else:
             with open('results/thread.log', 'a+') as f:
@@ -362,23 +849,10 @@ class Retriever(object):
                 f.write(str(r) + '\n')
             return False
 
-    @staticmethod
-    def erase_job_dir(d) -> None:
-        for f in os.listdir(d):
-            f = os.path.join(d, f)
-            if os.path.isdir(f):
-                self.erase_job_dir(f)
-            else:
-                os.remove(f)
-        os.rmdir(d)
-
-    def _get_jobs(self) -> list:       
-        return os.listdir('.KVFinder-web')
-
 
 class Evaluator(object):
 
-    def __init__(self, time_fn:str='results/time-statistics.txt'):
+    def __init__(self, time_fn:str='results/time-statistics.txt', runs: Optional[List[str]]=None, columns: Optional[List[str]]=None):
         # Create images directory in results directory
         try: 
             os.mkdir('results/images/')
@@ -386,68 +860,212 @@ class Evaluator(object):
             pass
 
         # Read time data
-        self.data = self.read(time_fn)
+        self.data = self.read(time_fn, runs, columns)
 
     @staticmethod
-    def read(time_fn: str):
-        data = pd.read_table(time_fn, index_col=False)
+    def read(time_fn: str, runs: Optional[List[str]]=None, columns: Optional[List[str]]=None):
+        """ Read time statistics from a file or a result store directory
+
+        runs selects runs of a result store (default: all), columns the
+        columns to load (default: all).
+        """
+        if os.path.isdir(time_fn):
+            data = ResultStore(time_fn).read(runs, columns)
+        else:
+            data = pd.read_table(time_fn, index_col=False, usecols=columns)
+        # Parse timestamps in bulk
+        for column in TIMESTAMPS:
+            if column in data.columns:
+                data[column] = pd.to_datetime(data[column], utc=True)
         return data
 
 
     def plots(self):
+        self.bar()
         self.scatter()
         self.hist()
+        if len(self.timed()) > 0:
+            self.timelines()
+
+
+    def summary(self, by: List[str]=['n_workers']) -> pd.DataFrame:
+        """ Percentiles of TIMES and throughput (jobs/min) for each group of jobs """
+        return self.statistics(self.data, by)
+
+
+    @staticmethod
+    def statistics(data: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+        grouped = data.groupby(by)
+
+        # QUANTILES of every time column in one pass
+        stats = grouped[TIMES].quantile(QUANTILES).unstack()
+        stats.columns = [f"{column}_p{round(q * 100)}" for column, q in stats.columns]
+
+        stats['jobs'] = grouped.size()
+        if 'run' in data.columns and 'run' not in by:
+            # Runs (repeated trials) of a group did not overlap, so their makespans add up
+            stats['makespan'] = Evaluator._makespan(data.groupby(by + ['run'])).groupby(level=by).sum()
+        else:
+            stats['makespan'] = Evaluator._makespan(grouped)
+        stats['throughput'] = 60.0 * stats['jobs'] / stats['makespan']
+        return stats
+
+
+    @staticmethod
+    def _makespan(grouped) -> pd.Series:
+        # Seconds from the first job created to the last job ended. Without
+        # timestamps, jobs are assumed to be queued together (as Sender does),
+        # so the longest total_time is the makespan.
+        if 'created_at' in grouped.obj.columns and 'ended_at' in grouped.obj.columns:
+            return (grouped['ended_at'].max() - grouped['created_at'].min()).dt.total_seconds()
+        return grouped['total_time'].max()
+
+
+    def trials(self, by: List[str]=['n_workers']) -> pd.DataFrame:
+        """ Metrics averaged over repeated runs, with bootstrap confidence intervals (see trials.py) """
+        import trials
+        return trials.summarize(self.data, by)
+
+
+    def scaling(self, by: List[str]=[]) -> pd.DataFrame:
+        """ Speedup and parallel efficiency of throughput versus number of kv-workers
+
+        Relative to the smallest number of kv-workers measured in each group.
+        """
+        stats = self.summary(by + ['n_workers']).reset_index().sort_values(by + ['n_workers'])
+        base = stats.groupby(by) if len(by) > 0 else stats.groupby(np.zeros(len(stats)))
+        stats['speedup'] = stats['throughput'] / base['throughput'].transform('first')
+        stats['efficiency'] = stats['speedup'] / (stats['n_workers'] / base['n_workers'].transform('first'))
+        return stats
+
+
+    def fit_scaling(self) -> Dict[str, float]:
+        """ Universal Scalability Law fit of the speedup: n / (1 + sigma (n - 1) + kappa n (n - 1))
+
+        sigma is the serial (contention) fraction, Amdahl's law when kappa is
+        0; kappa is the coherency (crosstalk) cost. Throughput peaks at
+        peak_workers kv-workers.
+        """
+        stats = self.scaling()
+        n = (stats['n_workers'] / stats['n_workers'].iloc[0]).to_numpy(dtype=float)
+        speedup = stats['speedup'].to_numpy(dtype=float)
+        if len(n) < 2:
+            return {'sigma': np.nan, 'kappa': np.nan, 'peak_workers': np.nan}
+
+        # n / speedup - 1 = sigma (n - 1) + kappa n (n - 1), linear in sigma and kappa
+        X = np.column_stack([n - 1, n * (n - 1)])
+        sigma, kappa = np.maximum(np.linalg.lstsq(X, n / speedup - 1, rcond=None)[0], 0.0)
+        peak = max(np.sqrt((1 - sigma) / kappa), 1.0) * stats['n_workers'].iloc[0] if kappa > 0 else np.inf
+        return {'sigma': float(sigma), 'kappa': float(kappa), 'peak_workers': float(peak)}
+
+
+    @staticmethod
+    def usl(n: Any, sigma: float, kappa: float) -> np.ndarray:
+        n = np.asarray(n, dtype=float)
+        return n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+    def utilization(self) -> pd.DataFrame:
+        """ Busy, idle, saturated and starved fraction of the kv-workers of each run (see timeline.py) """
+        import timeline
+        data = self.timed()
+        return timeline.utilization(data).merge(timeline.head_of_line(data), on='run')
+
+
+    def timelines(self) -> None:
+        """ Gantt chart and queue depth of each run in results/images/timeline """
+        import timeline
+        timeline.plot(self.timed())
+
+
+    def timed(self) -> pd.DataFrame:
+        """ Jobs with server timestamps (rows saved before they were kept have none) """
+        if not all(column in self.data.columns for column in TIMESTAMPS):
+            return self.data.iloc[:0]
+        return self.data.dropna(subset=TIMESTAMPS)
+
+
+    def payload(self) -> pd.DataFrame:
+        """ Encoded and gzip bytes of each request and reply member (PAYLOAD_FIELDS)
+
+        share is the member's part of its request or reply; limit is the
+        largest request or reply over the server limit (REQUEST_LIMIT,
+        RESPONSE_LIMIT).
+        """
+        rows = []
+        # Jobs with payload sizes (rows saved before they were recorded have none)
+        data = self.data.dropna(subset=['request_size']) if 'request_size' in self.data.columns else self.data.iloc[:0]
+        for field in PAYLOAD_FIELDS:
+            if f'{field}_size' not in data.columns:
+                continue
+            size, compressed = data[f'{field}_size'], data[f'{field}_compressed']
+            total = 'request' if PAYLOAD_FIELDS.index(field) < PAYLOAD_FIELDS.index('response') else 'response'
+            rows.append({
+                'field': field,
+                'mean': size.mean(),
+                'p95': size.quantile(0.95),
+                'max': size.max(),
+                'compressed_mean': compressed.mean(),
+                'ratio': compressed.sum() / size.sum(),
+                'share': size.sum() / data[f'{total}_size'].sum(),
+                'limit': size.max() / (REQUEST_LIMIT if total == 'request' else RESPONSE_LIMIT) if field == total else np.nan,
+            })
+        return pd.DataFrame(rows).set_index('field')
+
+
+    def runtime_model(self, fn: str='results/runtime-model.json') -> Dict[str, model.LinearModel]:
+        """ Fit run time and output size models to the data and save them to fn (see model.load) """
+        models = model.train(self.data)
+        model.save(models, fn, jobs=len(self.data))
+        return models
 
 
-    # FIXME: Not useful results to plot yet
     def bar(self):
-        # Create scatter directory in images directory
+        # Create bar directory in images directory
         try: 
             os.mkdir('results/images/bar')
         except FileExistsError:
             pass
         
-        # Process sum of time
-        data = self.data
-        time = {
-            'total_time': [
-                np.mean(data[data.n_workers == 1]['total_time']),
-                np.mean(data[data.n_workers == 2]['total_time']),
-                np.mean(data[data.n_workers == 3]['total_time']),
-                np.mean(data[data.n_workers == 4]['total_time'])
-            ],
-            'elapsed_time': [
-                np.mean(data[data.n_workers == 1]['elapsed_time']),
-                np.mean(data[data.n_workers == 2]['elapsed_time']),
-                np.mean(data[data.n_workers == 3]['elapsed_time']),
-                np.mean(data[data.n_workers == 4]['elapsed_time'])
-            ],
-            'worker_time': [
-                np.mean(data[data.n_workers == 1]['worker_time']),
-                np.mean(data[data.n_workers == 2]['worker_time']),
-                np.mean(data[data.n_workers == 3]['worker_time']),
-                np.mean(data[data.n_workers == 4]['worker_time'])
-            ]
-        }
+        stats = self.scaling()
+        workers = stats['n_workers'].to_numpy()
+        r = np.arange(len(workers))
 
-        # Set position of bar on X axis
-        width = 0.25
-        r1 = np.arange(len(time['total_time']))
-        r2 = [x + width for x in r1]
-        r3 = [x + width for x in r2]
+        for column, label in zip(TIMES, ['Total Time (s)', 'Elapsed Time (s)', 'Worker Time (s)']):
 
-        # Bar plot: Sum of times
+            # Bar plot: percentiles of time for each number of kv-workers
+            width = 0.8 / len(QUANTILES)
+            plt.clf()
+            cm = matplotlib.colormaps['Paired']
+            for i, q in enumerate(QUANTILES):
+                p = round(q * 100)
+                plt.bar(r + i * width, stats[f'{column}_p{p}'], color=cm(i / (len(QUANTILES) - 1)), width=width, edgecolor='white', label=f'p{p}')
+            # Axis and Title
+            plt.title(f"{label} percentiles")
+            plt.xlabel('Number of kv-workers')
+            plt.ylabel(label)
+            plt.xticks(r + width * (len(QUANTILES) - 1) / 2, [str(w) for w in workers])
+            plt.legend()
+            plt.grid(True, axis='y')
+            plt.savefig(f'results/images/bar/{column}_percentiles.png', dpi=300)
+
+        # Throughput x Number of kv-workers, with scaling model
+        fit = self.fit_scaling()
         plt.clf()
-        cm = plt.cm.get_cmap('Paired')
-        print(time['total_time'])
-        plt.bar(r1, time['total_time'], color=cm(0), width=width, edgecolor='white', label='Total Time (s)')
-        # plt.bar(r2, time['elapsed_time'], color=cm(0.5), width=width, edgecolor='white', label='Elapsed Time (s)')
-        # plt.bar(r3, time['worker_time'], color=cm(1), width=width, edgecolor='white', label='Worker Time (s)')
+        cm = matplotlib.colormaps['Paired']
+        plt.bar(workers, stats['throughput'], color=cm(0), width=0.5, edgecolor='white', label='Measured')
+        if np.isfinite(fit['sigma']):
+            n = np.linspace(workers[0], workers[-1], 100)
+            model = stats['throughput'].iloc[0] * self.usl(n / workers[0], fit['sigma'], fit['kappa'])
+            plt.plot(n, model, c=cm(1.0), label=f"USL ($\\sigma$={fit['sigma']:.3f}, $\\kappa$={fit['kappa']:.4f})")
         # Axis and Title
+        plt.title('Throughput x Number of kv-workers')
         plt.xlabel('Number of kv-workers')
-        plt.xticks([r + width for r in range(len(time['total_time']))], ['1', '2', '3', '4'])
+        plt.ylabel('Throughput (jobs/min)')
+        plt.xticks(workers, [str(w) for w in workers])
         plt.legend()
-        plt.show()
+        plt.grid(True, axis='y')
+        plt.savefig('results/images/bar/throughput.png', dpi=300)
 
 
     def scatter(self):
@@ -457,21 +1075,18 @@ class Evaluator(object):
         except FileExistsError:
             pass
 
-        for worker in [1, 2, 3, 4]:
+        for worker, data in self.data.groupby('n_workers'):
 
-            # Get data from number of kv-workers
-            mask = self.data['n_workers'] == worker
-            data = self.data[mask]
             data['json_size'] /= 1e6
 
-            if worker == 1:
+            if worker == self.data['n_workers'].min():
 
                 # JSON size x Number of atoms - colored by probe out
                 x = 'Number of atoms'
                 y = 'JSON size (Mb)'
                 plt.clf()
                 # Scatter
-                cm = plt.cm.get_cmap('Paired')
+                cm = matplotlib.colormaps['Paired']
                 mask = data['removal_distance'] == 2.4
                 plt.scatter(data.n_atoms[mask], data.json_size[mask], c=data.probe_out[mask], marker='o', s=5, cmap=cm, alpha=0.5)
                 # Trendline
@@ -504,7 +1119,7 @@ class Evaluator(object):
                 plt.clf()
                 # Scatter
                 # Scatter
-                cm = plt.cm.get_cmap('Paired')
+                cm = matplotlib.colormaps['Paired']
                 mask = data['probe_out'] == 4.0
                 plt.scatter(data.n_atoms[mask], data.json_size[mask], c=data.removal_distance[mask], marker='o', s=5, cmap=cm, alpha=0.5)
                 # Trendline
@@ -537,7 +1152,7 @@ class Evaluator(object):
                 y = 'JSON size (Mb)'
                 plt.clf()
                 # Scatter
-                cm = plt.cm.get_cmap('coolwarm')
+                cm = matplotlib.colormaps['coolwarm']
                 color = data.elapsed_time
                 sc = plt.scatter(data.n_atoms, data.json_size, c=color, cmap=cm, vmin=0, vmax=ceil(max(data.elapsed_time)), marker = 'o', s=5)
                 # Colorbar
@@ -559,7 +1174,7 @@ class Evaluator(object):
                 y = 'Elapsed time (s)'
                 plt.clf()
                 # Scatter
-                cm = plt.cm.get_cmap('Paired')
+                cm = matplotlib.colormaps['Paired']
                 mask = data['removal_distance'] == 2.4
                 plt.scatter(data[mask].n_atoms, data[mask].elapsed_time, c=data[mask].probe_out, marker='o', s=5, cmap=cm, alpha=0.5)
                 # Trendline
@@ -592,7 +1207,7 @@ class Evaluator(object):
                 y = 'Elapsed time (s)'
                 plt.clf()
                 # Scatter
-                cm = plt.cm.get_cmap('Paired')
+                cm = matplotlib.colormaps['Paired']
                 mask = data['probe_out'] == 4.0
                 plt.scatter(data[mask].n_atoms, data[mask].elapsed_time, c=data[mask].removal_distance, marker='o', s=5, cmap=cm, alpha=0.5)
                 # Trendline
@@ -619,7 +1234,6 @@ class Evaluator(object):
                 plt.axis([0, xmax, 0, ymax])
                 plt.grid(True)
                 plt.savefig(f"results/images/scatter/elapsed_time_x_atoms_with_removal_distance_{worker}_kv-worker{'s' if worker > 1 else ''}.png", dpi=300)
-                exit()
         
 
     def hist(self):
@@ -629,19 +1243,15 @@ class Evaluator(object):
         except FileExistsError:
             pass
 
-        for worker in [1, 2, 3, 4]:
-            
-            # Get data from number of kv-workers
-            mask = self.data['n_workers'] == worker
-            data = self.data[mask]
+        for worker, data in self.data.groupby('n_workers'):
 
-            if worker == 1:
+            if worker == self.data['n_workers'].min():
                 # Number of atoms
                 x = 'Number of atoms'
                 y = 'Frequency'
                 plt.clf()
                 plt.hist('n_atoms', data=data, bins='auto')
-                plt.title(f'{x} for 1 kv-worker')
+                plt.title(f"{x} for {worker} kv-worker{'s' if worker > 1 else ''}")
                 plt.xlabel(f'{x}')
                 plt.ylabel(f'{y}')
                 xmax = 10 * ceil(max(data['n_atoms']) / 10)
@@ -654,7 +1264,7 @@ class Evaluator(object):
                 x = 'JSON size (Mb)'
                 y = 'Frequency'
                 plt.clf()
-                plt.title(f'{x} for 1 kv-worker')
+                plt.title(f"{x} for {worker} kv-worker{'s' if worker > 1 else ''}")
                 data['json_size'] /= 1e6
                 plt.hist('json_size', data=data, bins='auto')
                 plt.xlabel(f'{x}')
@@ -709,18 +1319,11 @@ class Evaluator(object):
 
 
 def get_number_of_atoms(pdb):
-    from Bio.PDB import PDBParser
     # Read pdb
-    parser = PDBParser(PERMISSIVE=1, QUIET=True)
-    structure = parser.get_structure(f"{pdb.replace('kv1000/', '').replace('.pdb', '')}", pdb)
+    with open(pdb) as f:
+        atoms = read_atoms(f.readlines())
     # Count number of atoms
-    n_atoms = 0
-    for model in structure:
-        for chain in model:
-            for residue in chain:
-                for atom in residue:
-                    n_atoms += 1
-    return n_atoms
+    return count_atoms(atoms)
 
 
 if __name__ == "__main__":
@@ -733,41 +1336,14 @@ if __name__ == "__main__":
     except FileExistsError:
         pass
 
-    # for workers in [1, 2, 3, 4]:
-
-    #     print(f"[==> KV Server working with {workers} worker{'s' if workers > 1 else ''}")
-
-    #     # Docker up
-    #     os.system(f'docker-compose up -d --scale kv-worker={workers}')
-
-    #     # Create and Configure Sender
-    #     sender = Sender(server="http://localhost:8081")
-
-    #     print("> Sending jobs to KV Server")
-
-    #     # Send jobs to KV server
-    #     for pdb in dataset.pdb_list:
-    #         print(f'> {pdb}', end='', flush=True)       
-    #         for po in [4.0, 6.0, 8.0]:
-    #             job = Job(pdb=pdb, probe_out=po, removal_distance=2.4)
-    #             sender.run(job)
-    #         for rd in [0.0, 0.6, 1.2]:
-    #             job = Job(pdb=pdb, probe_out=4.0, removal_distance=rd)
-    #             sender.run(job)
-    #         print('\b' * 19, end='', flush=True)
-        
-    #     time.sleep(60)
-
-    #     print("> Retrieving jobs from KV Server")
-
-    #     # Create and Configure Retriever
-    #     retriever = Retriever(server="http://localhost:8081", workers=workers)
-    #     # Start retriever
-    #     retriever.start()
-
-    #     # Erase .KVFinder-web
-    #     os.system('rm -r .KVFinder-web')
+    # Scaling studies (docker-compose --scale kv-worker=N, or a simulated
+    # server) are run with study.py, e.g.
+    # python study.py --backend docker --workers 1 2 3 4 --warmup 60
 
     # Create and configure evaluator
     evaluator = Evaluator()
+    print(evaluator.scaling().to_string(index=False))
+    print(evaluator.fit_scaling())
+    if 'request_size' in evaluator.data.columns:
+        print(evaluator.payload().to_string())
     evaluator.plots()
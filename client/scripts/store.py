@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import glob
+import socket
+import platform
+import subprocess
+import uuid
+import pandas as pd
+from datetime import datetime, timezone
+from typing import Optional, Any, Dict, List, Iterable
+
+
+# Parquet needs pyarrow; without it parts are written as tab-separated files
+try:
+    import pyarrow
+    FORMAT = 'parquet'
+except ImportError:
+    FORMAT = 'tsv'
+
+
+class ResultStore(object):
+    """ Append-only benchmark results, one directory per run
+
+        <directory>/run=<run id>/run.json         run metadata
+        <directory>/run=<run id>/part-00000.<ext>  batch of job rows
+
+    Rows are buffered and written `batch_size` at a time as Parquet (or TSV
+    when pyarrow is not installed). Parts are never rewritten, so an
+    interrupted run keeps every batch flushed before the interruption.
+    """
+
+    def __init__(self, directory: str='results/store', batch_size: int=1000):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.run_id: Optional[str] = None
+        self._rows: List[Dict[str, Any]] = []
+        self._parts = 0
+        os.makedirs(directory, exist_ok=True)
+
+
+    def start_run(self, n_workers: Optional[int]=None, n_workers_source: str='argument', run_id: Optional[str]=None, **metadata) -> str:
+        """ Begin a new run (or resume run_id) and save its metadata """
+        self.close()
+        self.run_id = run_id if run_id != None else datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ') + '-' + uuid.uuid4().hex[:6]
+        os.makedirs(self._run_dir(), exist_ok=True)
+        self._parts = len(self._part_files(self.run_id))
+
+        fn = os.path.join(self._run_dir(), 'run.json')
+        if not os.path.exists(fn):
+            info = {
+                'run': self.run_id,
+                'started_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+                'host': socket.gethostname(),
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'commit': _commit(),
+                'argv': sys.argv,
+                'n_workers': n_workers,
+                # How n_workers was obtained (e.g. argument, docker)
+                'n_workers_source': n_workers_source,
+            }
+            info.update(metadata)
+            with open(fn, 'w') as f:
+                json.dump(info, f, indent=2)
+        return self.run_id
+
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """ Add a job row to the current run """
+        if self.run_id == None:
+            self.start_run()
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+
+    def extend(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            self.append(row)
+
+
+    def flush(self) -> None:
+        """ Write buffered rows as a new part """
+        if len(self._rows) == 0:
+            return
+        data = pd.DataFrame(self._rows)
+        fn = os.path.join(self._run_dir(), f'part-{self._parts:05d}.{FORMAT}')
+        # Write to a temporary name first so readers never see half a part
+        tmp = fn + '.tmp'
+        if FORMAT == 'parquet':
+            data.to_parquet(tmp, index=False)
+        else:
+            data.to_csv(tmp, sep='\t', index=False)
+        os.replace(tmp, fn)
+        self._parts += 1
+        self._rows = []
+
+
+    def close(self) -> None:
+        self.flush()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def runs(self) -> pd.DataFrame:
+        """ Metadata of every run, one row per run """
+        rows = []
+        for fn in sorted(glob.glob(os.path.join(self.directory, 'run=*', 'run.json'))):
+            with open(fn) as f:
+                rows.append(json.load(f))
+        return pd.DataFrame(rows)
+
+
+    def read(self, runs: Optional[Iterable[str]]=None, columns: Optional[List[str]]=None) -> pd.DataFrame:
+        """ Rows of the selected runs (default: all), only `columns` if given
+
+        A run column identifies the run of each row.
+        """
+        if runs == None:
+            runs = [os.path.basename(d)[len('run='):] for d in sorted(glob.glob(os.path.join(self.directory, 'run=*')))]
+        frames = []
+        for run in runs:
+            for fn in self._part_files(run):
+                if fn.endswith('.parquet'):
+                    data = pd.read_parquet(fn, columns=columns)
+                else:
+                    data = pd.read_table(fn, usecols=columns)
+                frames.append(data.assign(run=run))
+        if len(frames) == 0:
+            return pd.DataFrame(columns=(columns or []) + ['run'])
+        return pd.concat(frames, ignore_index=True)
+
+
+    def _run_dir(self, run_id: Optional[str]=None) -> str:
+        return os.path.join(self.directory, f'run={run_id or self.run_id}')
+
+
+    def _part_files(self, run_id: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(self._run_dir(run_id), 'part-*.parquet')) + glob.glob(os.path.join(self._run_dir(run_id), 'part-*.tsv')), key=os.path.basename)
+
+
+def _commit() -> Optional[str]:
+    # Commit of the benchmark scripts, None outside a git checkout
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,93 @@
+import numpy as np
+from typing import List, Tuple
+
+
+# ATOM/HETATM fields kept from a PDB file, one row per atom. `line` is the
+# index of the record in the list of lines it was read from.
+ATOM_DTYPE = np.dtype([
+    ('line', np.int64),
+    ('record', 'U6'),
+    ('name', 'U4'),
+    ('altloc', 'U1'),
+    ('resname', 'U3'),
+    ('chain', 'U1'),
+    ('resseq', np.int64),
+    ('icode', 'U1'),
+    ('x', np.float64),
+    ('y', np.float64),
+    ('z', np.float64),
+    ('element', 'U2'),
+])
+
+# Fixed columns (start, end) of the PDB format
+COLUMNS = {
+    'record': (0, 6),
+    'name': (12, 16),
+    'altloc': (16, 17),
+    'resname': (17, 20),
+    'chain': (21, 22),
+    'resseq': (22, 26),
+    'icode': (26, 27),
+    'x': (30, 38),
+    'y': (38, 46),
+    'z': (46, 54),
+    'element': (76, 78),
+}
+
+
+def read_atoms(lines: List[str]) -> np.ndarray:
+    """ Parse ATOM and HETATM records of PDB lines into a structured array """
+    index = [i for i, line in enumerate(lines) if line.startswith('ATOM') or line.startswith('HETATM')]
+    atoms = np.zeros(len(index), dtype=ATOM_DTYPE)
+    if len(index) == 0:
+        return atoms
+    atoms['line'] = index
+
+    # One row of 80 characters per record, sliced by column for every atom at once
+    records = np.array([lines[i][:80].rstrip('\r\n').ljust(80).encode('ascii', 'replace') for i in index], dtype='S80')
+    chars = records.view('S1').reshape(len(index), 80)
+
+    for field, (start, end) in COLUMNS.items():
+        column = np.ascontiguousarray(chars[:, start:end]).view(f'S{end - start}').ravel()
+        if field in ['x', 'y', 'z']:
+            atoms[field] = column.astype(np.float64)
+        elif field == 'resseq':
+            atoms[field] = _integers(column)
+        else:
+            atoms[field] = np.char.strip(column).astype('U')
+
+    # Element from atom name when columns 77-78 are empty
+    missing = atoms['element'] == ''
+    if missing.any():
+        names = np.char.lstrip(atoms['name'][missing], ' 0123456789')
+        atoms['element'][missing] = np.char.upper(np.array([name[:1] for name in names], dtype='U1'))
+
+    return atoms
+
+
+def _integers(column: np.ndarray) -> np.ndarray:
+    try:
+        return column.astype(np.int64)
+    except ValueError:
+        # Blank or non-decimal (e.g. hybrid-36) values become 0
+        return np.array([int(value) if value.strip().lstrip(b'-').isdigit() else 0 for value in column], dtype=np.int64)
+
+
+def count_atoms(atoms: np.ndarray) -> int:
+    """ Number of atoms, counting alternate locations once (like Bio.PDB) """
+    altloc = atoms['altloc']
+    if not (altloc != '').any():
+        return len(atoms)
+    first = np.min(altloc[altloc != ''])
+    return int(np.count_nonzero((altloc == '') | (altloc == first)))
+
+
+def bounding_box(atoms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ Minimum and maximum (x, y, z) of the atoms """
+    xyz = coordinates(atoms)
+    return xyz.min(axis=0), xyz.max(axis=0)
+
+
+def coordinates(atoms: np.ndarray) -> np.ndarray:
+    """ (n, 3) array of atom coordinates """
+    return np.column_stack([atoms['x'], atoms['y'], atoms['z']])
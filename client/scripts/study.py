@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import shutil
+import subprocess
+import requests
+import pandas as pd
+from typing import Optional, Any, Callable, Dict, List
+from performance import Job, Sender, Retriever
+from store import ResultStore
+from transport import Transport
+
+
+class LocalBackend(object):
+    """ KVFinder-web simulated in this process (see localserver.py) """
+
+    name = 'local'
+
+    def __init__(self, host: str='localhost', port: int=8081, **kwargs):
+        self.host = host
+        self.port = port
+        # Queue options (time_scale, seed, ...)
+        self.kwargs = kwargs
+        self._server = None
+
+
+    @property
+    def server(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+
+    def up(self, workers: int) -> None:
+        from localserver import LocalServer
+        self._server = LocalServer(self.host, self.port, workers=workers, **self.kwargs)
+        self._server.start()
+
+
+    def workers(self) -> int:
+        return self._server.queue.workers
+
+
+    def down(self) -> None:
+        if self._server != None:
+            self._server.stop()
+            self._server = None
+
+
+class DockerBackend(object):
+    """ KVFinder-web from docker-compose.yml, with `workers` kv-worker replicas
+
+    down() removes the volumes, so every configuration starts with an empty
+    queue (otherwise the server would return the jobs of the previous one).
+    """
+
+    name = 'docker-compose'
+
+    def __init__(self, compose_file: str='../../docker-compose.yml', server: str='http://localhost:8081'):
+        self.compose_file = compose_file
+        self.server = server
+
+
+    def up(self, workers: int) -> None:
+        self._compose('up', '-d', '--scale', f'kv-worker={workers}')
+
+
+    def workers(self) -> int:
+        """ Number of kv-worker containers actually running """
+        ids = self._compose('ps', '-q', 'kv-worker').split()
+        return len(ids)
+
+
+    def down(self) -> None:
+        self._compose('down', '--volumes')
+
+
+    def _compose(self, *args) -> str:
+        return subprocess.run(['docker-compose', '-f', self.compose_file] + list(args), check=True, capture_output=True, text=True).stdout
+
+
+class ScalingStudy(object):
+    """ Run the same jobs against a backend with each number of kv-workers
+
+    For each worker count the backend is brought up with an empty queue,
+    the first `warmup` jobs are run and retrieved (warm-up phase), then the
+    rest (measure phase). Each phase is a run of the result store in
+    `directory`, with study, phase and backend in its metadata. Retriever
+    polls until every job is retrieved, so the queue is drained before the
+    next phase starts.
+
+    With trials > 1 this is repeated, from an empty queue each time, to
+    measure run-to-run variation (see trials.py).
+
+    Progress is kept in <directory>/study.json: a study started again with
+    the same directory skips the trials already finished and redoes the one
+    that was interrupted.
+    """
+
+    def __init__(self, backend: Any, jobs: Callable[[], List[Job]], workers: List[int]=[1, 2, 3, 4], warmup: int=0, directory: str='results/study', interval: float=5.0, ready_timeout: float=300.0, trials: int=1):
+        self.backend = backend
+        # Called for every trial, since jobs are changed when run
+        self.jobs = jobs
+        self.workers = workers
+        self.warmup = warmup
+        self.trials = trials
+        self.directory = directory
+        self.interval = interval
+        self.ready_timeout = ready_timeout
+
+        self.store = ResultStore(directory)
+        self.state_fn = os.path.join(directory, 'study.json')
+        self.state = self._load_state()
+
+
+    def run(self) -> None:
+        for workers in self.workers:
+            state = self.state['configurations'].setdefault(str(workers), {'trials': []})
+
+            # Runs of an interrupted trial are not part of the results
+            for trial in state['trials']:
+                if not trial.get('done'):
+                    state['discarded'] = state.get('discarded', []) + [trial[phase] for phase in ['warmup', 'measure'] if phase in trial]
+            state['trials'] = [trial for trial in state['trials'] if trial.get('done')]
+
+            if len(state['trials']) >= self.trials:
+                print(f"[==> {workers} kv-worker{'s' if workers > 1 else ''}: done, skipping")
+                continue
+
+            while len(state['trials']) < self.trials:
+                print(f"[==> KV Server working with {workers} worker{'s' if workers > 1 else ''} (trial {len(state['trials']) + 1}/{self.trials})")
+                trial = {'trial': len(state['trials'])}
+                state['trials'].append(trial)
+                self._clean()
+
+                # Every trial starts from an empty queue, otherwise the server
+                # would return the jobs of the previous one
+                self.backend.down()
+                self.backend.up(workers)
+                try:
+                    self._wait_ready()
+                    jobs = self.jobs()
+                    for phase, phase_jobs in [('warmup', jobs[:self.warmup]), ('measure', jobs[self.warmup:])]:
+                        if len(phase_jobs) > 0:
+                            self._run_phase(workers, trial, phase, phase_jobs)
+                    trial['done'] = True
+                    self._save_state()
+                finally:
+                    self.backend.down()
+
+
+    def runs(self, phase: str='measure') -> List[str]:
+        """ Run ids of the finished trials for a phase """
+        return [trial[phase] for state in self.state['configurations'].values() for trial in state['trials'] if trial.get('done') and phase in trial]
+
+
+    def results(self, phase: str='measure', columns: Optional[List[str]]=None) -> pd.DataFrame:
+        return self.store.read(self.runs(phase), columns)
+
+
+    def _run_phase(self, workers: int, trial: Dict[str, Any], phase: str, jobs: List[Job]) -> None:
+        trial[phase] = self.store.start_run(
+            n_workers=self.backend.workers(),
+            n_workers_source=self.backend.name,
+            study=self.state['study'],
+            phase=phase,
+            trial=trial['trial'],
+            requested_workers=workers,
+            backend=self.backend.name,
+            jobs=len(jobs),
+        )
+        self._save_state()
+
+        print(f"> {phase}: sending {len(jobs)} jobs")
+        Sender(server=self.backend.server).run_many(jobs)
+
+        print(f"> {phase}: retrieving jobs")
+        Retriever(server=self.backend.server, workers=workers, store=self.store).start(self.interval)
+
+
+    def _wait_ready(self) -> None:
+        # Server answers GET / once it is up
+        transport = Transport(self.backend.server, retries=0)
+        deadline = time.monotonic() + self.ready_timeout
+        while True:
+            try:
+                if transport.get('/').ok:
+                    return
+            except requests.RequestException:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{self.backend.server} not ready after {self.ready_timeout} s")
+            time.sleep(1.0)
+
+
+    def _clean(self) -> None:
+        # Jobs left by an interrupted phase
+        shutil.rmtree('.KVFinder-web', ignore_errors=True)
+        os.makedirs('.KVFinder-web', exist_ok=True)
+
+
+    def _load_state(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_fn):
+            with open(self.state_fn) as f:
+                return json.load(f)
+        return {'study': os.path.basename(os.path.abspath(self.directory)) + time.strftime('-%Y%m%dT%H%M%S'), 'configurations': {}}
+
+
+    def _save_state(self) -> None:
+        with open(self.state_fn + '.tmp', 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(self.state_fn + '.tmp', self.state_fn)
+
+
+if __name__ == "__main__":
+    import argparse
+    from performance import Dataset, Evaluator
+
+    parser = argparse.ArgumentParser(description='KVFinder-web scaling study')
+    parser.add_argument('--backend', choices=['docker', 'local'], default='docker')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 3, 4])
+    parser.add_argument('--warmup', type=int, default=0, help='jobs run (and discarded) before measuring each trial')
+    parser.add_argument('--trials', type=int, default=1, help='repetitions of each configuration')
+    parser.add_argument('--subset', type=int, help='number of structures (stratified by atom count), default: all')
+    parser.add_argument('--directory', default='results/study', help='results and progress of the study')
+    parser.add_argument('--time-scale', type=float, default=1.0, help='service time factor (local backend)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs('results', exist_ok=True)
+
+    dataset = Dataset()
+    names = dataset.stratified(args.subset, seed=args.seed) if args.subset else dataset.pdb_list
+    grid = [{'probes.probe_out': po, 'cutoffs.removal_distance': 2.4} for po in [4.0, 6.0, 8.0]]
+    grid += [{'probes.probe_out': 4.0, 'cutoffs.removal_distance': rd} for rd in [0.0, 0.6, 1.2]]
+
+    if args.backend == 'docker':
+        backend = DockerBackend()
+    else:
+        backend = LocalBackend(time_scale=args.time_scale, seed=args.seed)
+
+    study = ScalingStudy(backend, lambda: [job for name in names for job in dataset.job(name).sweep(grid)], args.workers, args.warmup, args.directory, trials=args.trials)
+    study.run()
+
+    evaluator = Evaluator(args.directory, runs=study.runs())
+    print(evaluator.scaling().to_string(index=False))
+    print(evaluator.fit_scaling())
+    print(evaluator.utilization().to_string(index=False))
+    if args.trials > 1:
+        print(evaluator.trials().to_string(index=False))
@@ -0,0 +1,36 @@
+import copy
+import itertools
+from typing import Any, Dict, List, Union
+from tag import encode_settings
+
+
+# A grid is either {setting: [values]} (every combination) or an explicit
+# list of {setting: value}. Settings are named by their path in
+# input["settings"], e.g. "probes.probe_out" or "cutoffs.removal_distance".
+Grid = Union[Dict[str, List[Any]], List[Dict[str, Any]]]
+
+
+def expand(grid: Grid) -> List[Dict[str, Any]]:
+    """ List of setting overrides described by a grid """
+    if isinstance(grid, dict):
+        names = list(grid.keys())
+        return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    return list(grid)
+
+
+def variants(settings: Dict[str, Any], grid: Grid) -> List[Dict[str, Any]]:
+    """ Copies of settings with each override applied, without duplicates
+
+    Two overrides that serialize to the same settings (e.g. 4 and 4.0) are
+    the same job for the server, so only the first one is kept.
+    """
+    unique = {}
+    for overrides in expand(grid):
+        variant = copy.deepcopy(settings)
+        for name, value in overrides.items():
+            group, field = name.split('.')
+            if group not in variant or field not in variant[group]:
+                raise KeyError(f"Unknown setting: {name}")
+            variant[group][field] = value
+        unique.setdefault(encode_settings(variant), variant)
+    return list(unique.values())
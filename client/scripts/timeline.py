@@ -0,0 +1,170 @@
+import os
+import heapq
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+from typing import Iterator, List, Tuple
+
+
+# Timestamps closer than this (s) are taken as the same instant
+TOLERANCE = 1e-3
+
+
+def runs(data: pd.DataFrame) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """ Jobs of each run (or of each number of kv-workers without a run column) """
+    key = 'run' if 'run' in data.columns else 'n_workers'
+    for run, group in data.groupby(key):
+        yield str(run), group
+
+
+def timeline(data: pd.DataFrame) -> pd.DataFrame:
+    """ created, started and ended (s since the first job of the run was created) and lane of every job
+
+    The server does not say which kv-worker ran a job, so jobs are packed
+    into the fewest lanes (workers) that never run two jobs at once.
+    """
+    frames = []
+    for run, group in runs(data):
+        t0 = group['created_at'].min()
+        frame = pd.DataFrame({
+            'run': run,
+            'id': group['id'].to_numpy(),
+            'n_atoms': group['n_atoms'].to_numpy(),
+            'created': (group['created_at'] - t0).dt.total_seconds().to_numpy(),
+            'started': (group['started_at'] - t0).dt.total_seconds().to_numpy(),
+            'ended': (group['ended_at'] - t0).dt.total_seconds().to_numpy(),
+        })
+        frame['lane'] = _lanes(frame['started'].to_numpy(), frame['ended'].to_numpy())
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _lanes(started: np.ndarray, ended: np.ndarray) -> np.ndarray:
+    # Interval partitioning: reuse the lane freed first if it is free by then
+    lanes = np.zeros(len(started), dtype=int)
+    busy: List[Tuple[float, int]] = []
+    n_lanes = 0
+    for i in np.argsort(started, kind='stable'):
+        if len(busy) > 0 and busy[0][0] <= started[i] + TOLERANCE:
+            _, lane = heapq.heappop(busy)
+        else:
+            lane = n_lanes
+            n_lanes += 1
+        lanes[i] = lane
+        heapq.heappush(busy, (ended[i], lane))
+    return lanes
+
+
+def queue_depth(group: pd.DataFrame) -> pd.DataFrame:
+    """ Step curves of jobs queued and running over time (s since the first job was created)
+
+    Each row holds the counts from its time until the next row's time.
+    """
+    t0 = group['created_at'].min()
+    created, started, ended = [(group[t] - t0).dt.total_seconds().to_numpy() for t in ['created_at', 'started_at', 'ended_at']]
+    n = len(group)
+
+    times = np.concatenate([created, started, ended])
+    queued = np.concatenate([np.ones(n), -np.ones(n), np.zeros(n)])
+    running = np.concatenate([np.zeros(n), np.ones(n), -np.ones(n)])
+    order = np.argsort(times, kind='stable')
+    curve = pd.DataFrame({'time': times[order], 'queued': np.cumsum(queued[order]), 'running': np.cumsum(running[order])})
+    # Keep the state after the last event at each instant
+    return curve.groupby('time', as_index=False).last()
+
+
+def utilization(data: pd.DataFrame) -> pd.DataFrame:
+    """ Busy and idle fraction of the kv-workers of each run
+
+    busy: run time of all jobs over workers x time from first job created
+    to last job ended. saturated: fraction of that time with every worker
+    busy. starved: fraction with jobs queued while a worker was idle (time
+    lost dispatching jobs to workers).
+    """
+    rows = []
+    for run, group in runs(data):
+        curve = queue_depth(group)
+        workers = int(group['n_workers'].max()) if 'n_workers' in group.columns else int(curve['running'].max())
+        duration = np.diff(curve['time'].to_numpy(), append=curve['time'].iloc[-1])
+        window = curve['time'].iloc[-1] - curve['time'].iloc[0]
+        elapsed = (group['ended_at'] - group['started_at']).dt.total_seconds()
+        rows.append({
+            'run': run,
+            'n_workers': workers,
+            'jobs': len(group),
+            'window': window,
+            'busy': elapsed.sum() / (workers * window) if window > 0 else np.nan,
+            'saturated': duration[curve['running'].to_numpy() >= workers].sum() / window if window > 0 else np.nan,
+            'starved': duration[(curve['queued'].to_numpy() > 0) & (curve['running'].to_numpy() < workers)].sum() / window if window > 0 else np.nan,
+        })
+    utilization = pd.DataFrame(rows)
+    utilization['idle'] = 1 - utilization['busy']
+    return utilization
+
+
+def head_of_line(data: pd.DataFrame, long: float=0.9) -> pd.DataFrame:
+    """ How much short jobs wait behind long ones, per run
+
+    Long jobs are those with elapsed_time above the `long` quantile of the
+    run, short ones those below the median. For each run: mean number of
+    jobs queued when a long job started (the jobs it held up), share of all
+    queue time spent by short jobs, and p50/p95 stretch (total_time /
+    elapsed_time) of short jobs.
+    """
+    rows = []
+    for run, group in runs(data):
+        created = np.sort(group['created_at'].to_numpy())
+        started = np.sort(group['started_at'].to_numpy())
+        elapsed = (group['ended_at'] - group['started_at']).dt.total_seconds().to_numpy()
+        wait = (group['started_at'] - group['created_at']).dt.total_seconds().to_numpy()
+        total = wait + elapsed
+
+        is_long = elapsed >= np.quantile(elapsed, long)
+        is_short = elapsed <= np.median(elapsed)
+        # Jobs queued at each long job's start: created before it, started after it
+        long_starts = group['started_at'].to_numpy()[is_long]
+        queued = np.searchsorted(created, long_starts, side='right') - np.searchsorted(started, long_starts, side='right')
+        stretch = total[is_short] / np.maximum(elapsed[is_short], TOLERANCE)
+
+        rows.append({
+            'run': run,
+            'long_jobs': int(is_long.sum()),
+            'queued_at_long_start': float(queued.mean()) if len(queued) > 0 else np.nan,
+            'short_wait_share': wait[is_short].sum() / wait.sum() if wait.sum() > 0 else np.nan,
+            'short_stretch_p50': float(np.median(stretch)),
+            'short_stretch_p95': float(np.quantile(stretch, 0.95)),
+        })
+    return pd.DataFrame(rows)
+
+
+def plot(data: pd.DataFrame, directory: str='results/images/timeline') -> None:
+    """ Gantt chart and queue depth of each run """
+    os.makedirs(directory, exist_ok=True)
+    jobs = timeline(data)
+    for run, group in runs(data):
+        lanes = jobs[jobs['run'] == run]
+        curve = queue_depth(group)
+
+        plt.clf()
+        fig, (gantt, depth) = plt.subplots(2, 1, sharex=True, figsize=(10, 8), gridspec_kw={'height_ratios': [2, 1]})
+        cm = matplotlib.colormaps['coolwarm']
+
+        # Gantt: one row per (reconstructed) kv-worker, colored by number of atoms
+        colors = cm((lanes['n_atoms'] - lanes['n_atoms'].min()) / max(lanes['n_atoms'].max() - lanes['n_atoms'].min(), 1))
+        gantt.barh(lanes['lane'], lanes['ended'] - lanes['started'], left=lanes['started'], color=colors, edgecolor='none', height=0.8)
+        gantt.set_ylabel('kv-worker')
+        gantt.set_yticks(range(lanes['lane'].max() + 1))
+        gantt.set_title(f'Timeline of {run}')
+        gantt.grid(True, axis='x')
+
+        # Queue depth and running jobs
+        depth.step(curve['time'], curve['queued'], where='post', label='Queued')
+        depth.step(curve['time'], curve['running'], where='post', label='Running')
+        depth.set_xlabel('Time (s)')
+        depth.set_ylabel('Jobs')
+        depth.legend()
+        depth.grid(True)
+
+        fig.savefig(os.path.join(directory, f'{run}.png'), dpi=300)
+        plt.close(fig)
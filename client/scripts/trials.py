@@ -0,0 +1,155 @@
+import os
+import re
+import sys
+import json
+import numpy as np
+import pandas as pd
+from typing import Optional, Any, Callable, Dict, List, Tuple
+from performance import Evaluator
+
+
+# Metrics checked by compare() and whether lower or higher is better
+METRICS = {'total_time_p95': 'lower', 'throughput': 'higher'}
+
+
+def bootstrap(values: Any, statistic: Callable=np.mean, n: int=2000, rng: Optional[np.random.Generator]=None, chunk: int=250) -> np.ndarray:
+    """ statistic of n resamples (with replacement) of values
+
+    statistic must take an axis argument (np.mean, np.median, ...).
+    """
+    rng = np.random.default_rng() if rng == None else rng
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return np.full(n, np.nan)
+    samples = []
+    # Chunks of resamples bound memory for large values
+    for i in range(0, n, chunk):
+        index = rng.integers(0, len(values), size=(min(chunk, n - i), len(values)))
+        samples.append(statistic(values[index], axis=1))
+    return np.concatenate(samples)
+
+
+def interval(samples: np.ndarray, confidence: float=0.95) -> Tuple[float, float]:
+    """ Percentile confidence interval of bootstrap samples """
+    alpha = (1 - confidence) / 2
+    if np.all(np.isnan(samples)):
+        return np.nan, np.nan
+    return tuple(np.nanquantile(samples, [alpha, 1 - alpha]).tolist())
+
+
+def trial_metrics(data: pd.DataFrame, by: List[str]=['n_workers']) -> pd.DataFrame:
+    """ Evaluator statistics of every run (trial), one row per run and group """
+    return Evaluator.statistics(_runs(data), by + ['run']).reset_index()
+
+
+def _runs(data: pd.DataFrame) -> pd.DataFrame:
+    # Jobs of a time statistics file (no run column) are a single trial
+    if 'run' in data.columns:
+        return data
+    return data.assign(run='')
+
+
+def _samples(data: pd.DataFrame, metric: str, n: int, rng: np.random.Generator) -> np.ndarray:
+    # Bootstrap distribution of a metric of one configuration: across trials
+    # when there are several, otherwise across the jobs of the only trial
+    # (percentiles only; throughput of a single run has no resampling unit)
+    per_run = Evaluator.statistics(data, ['run'])[metric]
+    if len(per_run) > 1:
+        return bootstrap(per_run.to_numpy(), np.mean, n, rng)
+    match = re.fullmatch(r'(.+)_p(\d+)', metric)
+    if match == None:
+        return np.full(n, np.nan)
+    q = int(match.group(2))
+    return bootstrap(data[match.group(1)].to_numpy(), lambda x, axis: np.percentile(x, q, axis=axis), n, rng)
+
+
+def summarize(data: pd.DataFrame, by: List[str]=['n_workers'], metrics: List[str]=list(METRICS), n: int=2000, confidence: float=0.95, seed: Optional[int]=None) -> pd.DataFrame:
+    """ Mean over trials of each metric with a bootstrap confidence interval, per group """
+    rng = np.random.default_rng(seed)
+    rows = []
+    data = _runs(data)
+    for key, group in data.groupby(by):
+        key = key if isinstance(key, tuple) else (key,)
+        per_run = Evaluator.statistics(group, ['run'])
+        for metric in metrics:
+            low, high = interval(_samples(group, metric, n, rng), confidence)
+            rows.append(dict(zip(by, key), metric=metric, trials=len(per_run), value=per_run[metric].mean(), low=low, high=high))
+    return pd.DataFrame(rows)
+
+
+def compare(baseline: pd.DataFrame, candidate: pd.DataFrame, by: List[str]=['n_workers'], metrics: Dict[str, str]=METRICS, threshold: float=0.05, n: int=2000, confidence: float=0.95, seed: Optional[int]=None) -> pd.DataFrame:
+    """ Relative change of each metric from baseline to candidate, per group
+
+    change is candidate / baseline - 1 (mean over trials), with a bootstrap
+    confidence interval. A metric regresses when it gets worse by more than
+    threshold and its interval excludes no change (when no interval can be
+    computed, the threshold alone decides).
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    baseline, candidate = _runs(baseline), _runs(candidate)
+    candidates = dict(list(candidate.groupby(by)))
+    for key, base in baseline.groupby(by):
+        if key not in candidates:
+            continue
+        cand = candidates[key]
+        key = key if isinstance(key, tuple) else (key,)
+        base_runs, cand_runs = Evaluator.statistics(base, ['run']), Evaluator.statistics(cand, ['run'])
+        for metric, better in metrics.items():
+            change = cand_runs[metric].mean() / base_runs[metric].mean() - 1
+            low, high = interval(_samples(cand, metric, n, rng) / _samples(base, metric, n, rng) - 1, confidence)
+            # Positive when worse
+            sign = 1 if better == 'lower' else -1
+            worse, worse_low = sign * change, min(sign * low, sign * high)
+            regression = bool(worse > threshold and (np.isnan(worse_low) or worse_low > 0))
+            rows.append(dict(zip(by, key), metric=metric, baseline=base_runs[metric].mean(), candidate=cand_runs[metric].mean(), change=change, low=low, high=high, regression=regression))
+    return pd.DataFrame(rows)
+
+
+def select(source: str, directory: str='results/study', phase: str='measure') -> pd.DataFrame:
+    """ Results of a study directory (its finished trials) or of comma separated run ids in directory
+
+    Read with Evaluator.read, so timestamps are parsed for the makespan.
+    """
+    state_fn = os.path.join(source, 'study.json')
+    if os.path.exists(state_fn):
+        with open(state_fn) as f:
+            state = json.load(f)
+        runs = [trial[phase] for config in state['configurations'].values() for trial in config['trials'] if trial.get('done') and phase in trial]
+        return Evaluator.read(source, runs)
+    return Evaluator.read(directory, source.split(','))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Repeated-trial statistics of KVFinder-web benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    summary = commands.add_parser('summary', help='metrics with confidence intervals')
+    summary.add_argument('source', help='study directory or comma separated run ids')
+
+    diff = commands.add_parser('compare', help='fail (exit status 1) when candidate regresses from baseline')
+    diff.add_argument('baseline', help='study directory or comma separated run ids')
+    diff.add_argument('candidate', help='study directory or comma separated run ids')
+    diff.add_argument('--threshold', type=float, default=0.05, help='relative change tolerated (default: 0.05)')
+    diff.add_argument('--metric', action='append', help='metric:lower or metric:higher (default: total_time_p95:lower, throughput:higher)')
+
+    for command in [summary, diff]:
+        command.add_argument('--directory', default='results/study', help='result store of run ids')
+        command.add_argument('--by', nargs='+', default=['n_workers'])
+        command.add_argument('--confidence', type=float, default=0.95)
+        command.add_argument('--resamples', type=int, default=2000)
+        command.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pd.set_option('display.width', 200)
+    if args.command == 'summary':
+        print(summarize(select(args.source, args.directory), args.by, n=args.resamples, confidence=args.confidence, seed=args.seed).to_string(index=False))
+    else:
+        metrics = dict(metric.split(':') for metric in args.metric) if args.metric else METRICS
+        result = compare(select(args.baseline, args.directory), select(args.candidate, args.directory), args.by, metrics, args.threshold, args.resamples, args.confidence, args.seed)
+        print(result.to_string(index=False))
+        if result['regression'].any():
+            print(f"Regression beyond {args.threshold:.0%}")
+            sys.exit(1)
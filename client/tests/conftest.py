@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Modules of scripts/ are flat (imported by name, as the scripts do)
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+EXAMPLES = os.path.join(os.path.dirname(SCRIPTS), 'examples')
+sys.path.insert(0, SCRIPTS)
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from client import PollScheduler
+
+
+class Job(object):
+    def __init__(self, id: str):
+        self.id = id
+
+
+class Client(object):
+    # Replies of POST /status for each check, in order, and of the download
+    def __init__(self, statuses, output={'report': ''}):
+        self.statuses = list(statuses)
+        self.output = output
+        self.checks = 0
+
+    def _get_statuses(self, ids):
+        self.checks += 1
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        if isinstance(status, Exception):
+            raise status
+        return {job_id: status for job_id in ids}
+
+    def _download(self, kv_job):
+        return self.output
+
+
+def status(name: str, started_at=None):
+    return {'status': name, 'created_at': '2020-09-30T20:39:49.000000000Z', 'started_at': started_at}
+
+
+def scheduler(client=None, **kwargs) -> PollScheduler:
+    return PollScheduler(client, None, **kwargs)
+
+
+def test_backoff_while_queued():
+    poller = scheduler(interval=2.0, max_interval=60.0, backoff=2.0)
+    poll = {'queued_checks': 0}
+    assert [poller.next_check(poll, status('queued'), 0.0) for _ in range(7)] == [4.0, 8.0, 16.0, 32.0, 60.0, 60.0, 60.0]
+
+
+def test_closing_in_on_estimate():
+    poller = scheduler(interval=1.0, max_interval=60.0)
+    # Started 10 s after creation (server clock), submitted at local time 100
+    poll = {'queued_checks': 3, 'submitted': 100.0, 'estimate': 40.0}
+    running = status('running', started_at='2020-09-30T20:39:59.000000000Z')
+    assert poller.next_check(poll, running, 110.0) == 20.0
+    assert poller.next_check(poll, running, 130.0) == 10.0
+    assert poller.next_check(poll, running, 149.5) == 1.0
+    # Late: back off with how far the estimate was exceeded
+    assert poller.next_check(poll, running, 170.0) == 5.0
+    assert poller.next_check(poll, running, 1000.0) == 60.0
+    assert poll['queued_checks'] == 3
+
+
+def run(client, estimate=0.0, **kwargs):
+    async def main():
+        with ThreadPoolExecutor(2) as executor:
+            poller = PollScheduler(client, executor, interval=0.01, max_interval=0.05, **kwargs)
+            task = asyncio.ensure_future(poller.run())
+            try:
+                return await asyncio.wait_for(poller.add(Job('1'), estimate), 5.0)
+            finally:
+                task.cancel()
+    return asyncio.run(main())
+
+
+def test_polls_until_completed():
+    client = Client([status('queued'), status('queued'), status('running'), status('completed')])
+    assert run(client) == {'report': ''}
+    assert client.checks == 4
+
+
+def test_timed_out_and_missing_jobs():
+    assert run(Client([status('queued'), status('timed_out')])) == None
+    assert run(Client([None])) == None
+
+
+def test_retries_failed_checks():
+    client = Client([requests.ConnectionError('down'), {'error': 'busy'}, status('completed')], output={'log': ''})
+    assert run(client, retries=2) == {'log': ''}
+    with pytest.raises(requests.ConnectionError):
+        run(Client([requests.ConnectionError('down')]), retries=2)
@@ -0,0 +1,73 @@
+import copy
+import numpy as np
+from structure import read_atoms
+from crop import crop, search_space
+from validation import box_inside_grid
+
+
+def atom(serial: int, x: float, record: str='ATOM  ') -> str:
+    return f'{record}{serial:5d}  CA  ALA A{serial:4d}    {x:8.3f}{0.0:8.3f}{0.0:8.3f}  1.00  0.00           C\n'
+
+
+# Atoms along x every 5 A, from 0 to 95 A
+PDB = [atom(i + 1, 5.0 * i) for i in range(20)] + [
+    f'ANISOU{1:5d}  CA  ALA A   1      100    100    100      0      0      0       C\n',
+    f'ANISOU{20:5d}  CA  ALA A  20      100    100    100      0      0      0       C\n',
+    f'CONECT{1:5d}{2:5d}\n',
+    f'CONECT{19:5d}{20:5d}\n',
+    'END\n',
+]
+
+
+def settings(box_mode: bool=False, ligand_mode: bool=False, probe_out: float=4.0, removal_distance: float=2.4):
+    point = lambda x: {'x': x, 'y': 0.0, 'z': 0.0}
+    return {
+        'modes': {'whole_protein_mode': not box_mode, 'box_mode': box_mode, 'ligand_mode': ligand_mode},
+        'probes': {'probe_in': 1.4, 'probe_out': probe_out},
+        'cutoffs': {'volume_cutoff': 5.0, 'ligand_cutoff': 5.0, 'removal_distance': removal_distance},
+        'internalbox': {'p1': point(10.0), 'p2': point(20.0), 'p3': point(10.0), 'p4': point(10.0)},
+    }
+
+
+def test_whole_protein_keeps_everything():
+    data = {'settings': settings(), 'pdb': PDB}
+    assert crop(data, read_atoms(PDB)) == None
+
+
+def test_box_margin():
+    # Margin is 2 * probe_out + removal_distance + padding = 12.4 A
+    atoms = read_atoms(PDB)
+    keep = search_space(settings(box_mode=True), atoms)
+    assert np.array_equal(atoms['x'][keep], [0.0, 5.0, 10.0, 15.0, 20.0, 25.0, 30.0])
+    keep = search_space(settings(box_mode=True, probe_out=2.0, removal_distance=0.0), atoms, padding=0.0)
+    assert np.array_equal(atoms['x'][keep], [10.0, 15.0, 20.0])
+
+
+def test_ligand_margin():
+    # ligand_cutoff + margin = 5 + 12.4 A around the ligand at x = 50 A
+    atoms = read_atoms(PDB)
+    ligand = read_atoms([atom(1, 50.0, 'HETATM')])
+    keep = search_space(settings(ligand_mode=True), atoms, ligand)
+    assert np.array_equal(atoms['x'][keep], [35.0, 40.0, 45.0, 50.0, 55.0, 60.0, 65.0])
+
+
+def test_crop_drops_records_of_removed_atoms():
+    data = {'settings': settings(box_mode=True), 'pdb': PDB}
+    lines = crop(data, read_atoms(PDB))
+    assert len(read_atoms(lines)) == 7
+    # ANISOU of atom 1 kept, of atom 20 removed; CONECT kept only with all its atoms
+    assert [line[:11] for line in lines if not line.startswith('ATOM')] == ['ANISOU    1', 'CONECT    1', 'END\n']
+    assert data['pdb'] == PDB
+
+
+def test_crop_keeps_box_inside_grid():
+    # Box beyond the last atom (x = 95 A), inside the server's grid (up to
+    # 95 + probe_out + 20 A), but farther than the margin from every atom:
+    # the cropped structure would get the job rejected
+    data = {'settings': settings(box_mode=True), 'pdb': PDB}
+    for point, x in zip(['p1', 'p2', 'p3', 'p4'], [110.0, 115.0, 110.0, 110.0]):
+        data['settings']['internalbox'][point]['x'] = x
+    atoms = read_atoms(PDB)
+    assert box_inside_grid(data['settings'], atoms)
+    assert not search_space(data['settings'], atoms).any()
+    assert crop(copy.deepcopy(data), atoms) == None
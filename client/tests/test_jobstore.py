@@ -0,0 +1,72 @@
+import os
+import threading
+import pytest
+from conftest import EXAMPLES
+from jobstore import JobStore, PENDING
+from performance import Job
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / '.KVFinder-web' / 'jobs.db'))
+    yield store
+    store.close()
+
+
+def job(id: str, probe_out: float=4.0) -> Job:
+    job = Job(os.path.join(EXAMPLES, '1FMO.pdb'), probe_out=probe_out)
+    job.id = id
+    job.output_directory = 'results'
+    job.base_name = '1FMO'
+    return job
+
+
+class PluginJob(object):
+    # Job of the PyMOL plugin added by ID: no archive, payload or settings
+    def __init__(self, id: str):
+        self.id = id
+        self.pdb = None
+        self.ligand = None
+        self.output_directory = '/tmp'
+        self.base_name = 'output'
+        self.input = {'settings': {'modes': None, 'probes': None, 'cutoffs': None}}
+
+
+def test_add_and_load(store):
+    store.add(job('1', probe_out=6.0))
+    info = store.get('1')
+    assert info['status'] == 'queued'
+    assert info['probe_out'] == 6.0 and info['settings']['probes']['probe_out'] == 6.0
+    loaded = store.load('1')
+    assert (loaded.id, loaded.status, loaded.base_name, loaded.output_directory) == ('1', 'queued', '1FMO', 'results')
+    assert loaded.input['settings'] == info['settings']
+    assert store.get('2') == None and store.load('2') == None
+
+
+def test_update_only_changed_rows(store):
+    for id in ['1', '2', '3']:
+        store.add(job(id))
+    assert store.update({'1': 'running', '2': 'queued', '4': 'completed'}) == 1
+    assert store.update({'1': 'completed', '3': 'not_found'}) == 2
+    assert store.statuses() == {'1': 'completed', '2': 'queued', '3': 'not_found'}
+    assert store.ids(PENDING) == ['2']
+    assert store.counts() == {'completed': 1, 'queued': 1, 'not_found': 1}
+
+
+def test_plugin_job(store):
+    store.add(PluginJob('5'), 'completed')
+    info = store.get('5')
+    assert (info['status'], info['probe_out'], info['archive'], info['payload']) == ('completed', None, None, None)
+
+
+def test_shared_between_threads_and_connections(store):
+    threads = [threading.Thread(target=store.add, args=(job(str(i)),)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    other = JobStore(store.fn)
+    assert len(other.ids()) == 8
+    other.update({'0': 'running'})
+    other.close()
+    assert store.get('0')['status'] == 'running'
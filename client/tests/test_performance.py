@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from performance import Evaluator
+
+
+def evaluator(n_workers, throughput) -> Evaluator:
+    # Evaluator over a scaling table, without reading results files
+    evaluator = Evaluator.__new__(Evaluator)
+    speedup = np.asarray(throughput, dtype=float) / throughput[0]
+    evaluator.scaling = lambda by=[]: pd.DataFrame({'n_workers': n_workers, 'throughput': throughput, 'speedup': speedup})
+    return evaluator
+
+
+def test_usl_fit_recovers_parameters():
+    n = np.array([1, 2, 4, 8, 16])
+    throughput = 10.0 * Evaluator.usl(n, 0.05, 0.002)
+    fit = evaluator(n, throughput).fit_scaling()
+    assert fit['sigma'] == pytest.approx(0.05)
+    assert fit['kappa'] == pytest.approx(0.002)
+    assert fit['peak_workers'] == pytest.approx(np.sqrt(0.95 / 0.002))
+
+
+def test_usl_fit_relative_to_smallest_run():
+    # Same curve measured from 2 kv-workers on: peak in kv-workers, not multiples of 2
+    n = np.array([1, 2, 4, 8])
+    fit = evaluator(2 * n, 10.0 * Evaluator.usl(n, 0.1, 0.01)).fit_scaling()
+    assert fit['sigma'] == pytest.approx(0.1)
+    assert fit['peak_workers'] == pytest.approx(2 * np.sqrt(0.9 / 0.01))
+
+
+def test_usl_fit_linear_scaling():
+    fit = evaluator([1, 2, 4], [10.0, 20.0, 40.0]).fit_scaling()
+    assert fit['sigma'] == pytest.approx(0.0, abs=1e-12) and fit['kappa'] == pytest.approx(0.0, abs=1e-12)
+    assert fit['peak_workers'] == np.inf
+
+
+def test_usl_fit_needs_two_runs():
+    fit = evaluator([1], [10.0]).fit_scaling()
+    assert np.isnan(fit['sigma']) and np.isnan(fit['peak_workers'])
@@ -0,0 +1,18 @@
+import os
+import filecmp
+import pytest
+from conftest import SCRIPTS
+
+PLUGIN = os.path.join(os.path.dirname(SCRIPTS), 'PyMOL-KVFinder-web-tools')
+# Modules the plugin shares with scripts/, edited there and copied over
+SHARED = ['cache.py', 'crop.py', 'jobstore.py', 'model.py', 'stream.py', 'structure.py', 'tag.py', 'transport.py', 'validation.py']
+
+
+@pytest.mark.parametrize('name', SHARED)
+def test_plugin_copy_is_up_to_date(name):
+    assert filecmp.cmp(os.path.join(SCRIPTS, name), os.path.join(PLUGIN, name), shallow=False), f'copy {name} from scripts/ to the plugin'
+
+
+def test_every_plugin_module_is_shared():
+    modules = {name for name in os.listdir(PLUGIN) if name.endswith('.py') and name != '__init__.py'}
+    assert modules == set(SHARED)
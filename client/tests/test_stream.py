@@ -0,0 +1,75 @@
+import io
+import json
+import random
+import pytest
+from stream import ReplyStream, FIELD_PATHS
+
+
+REPLY = {
+    'id': '4622669018374292761',
+    'status': 'completed',
+    'output': {
+        'pdb_kv': ''.join(f'ATOM  {i:5d}  HS  KAA   259       1.000   2.000   3.000  0.00  0.00\n' for i in range(2000)),
+        'report': '# TOML results file\n[RESULTS.VOLUME]\nKAA = 11.23\n',
+        'log': 'ok é \U0001f600 "quoted" \\ \t',
+    },
+    'created_at': '2020-09-30T20:39:49.153963Z',
+    'numbers': [0, -1, 2.5, 1e-7, True, False, None, [], {}],
+}
+
+
+def chunks(body: bytes, size: int):
+    return (body[i:i + size] for i in range(0, len(body), size))
+
+
+@pytest.mark.parametrize('size', [1, 7, 64, 4096, 1 << 20])
+def test_round_trip(size):
+    body = json.dumps(REPLY).encode('utf-8')
+    stream = ReplyStream(chunks(body, size))
+    assert stream.read() == REPLY
+    assert stream.size == len(body)
+
+
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+def test_cavity_and_tee(ensure_ascii):
+    body = json.dumps(REPLY, indent=1, ensure_ascii=ensure_ascii).encode('utf-8')
+    cavity, tee = io.BytesIO(), io.BytesIO()
+    reply = ReplyStream(chunks(body, 333), cavity=cavity, tee=tee).read()
+    assert reply['output']['pdb_kv'] == None
+    assert reply['output']['log'] == REPLY['output']['log']
+    assert cavity.getvalue().decode('utf-8') == REPLY['output']['pdb_kv']
+    assert tee.getvalue() == body
+
+
+def test_escaped_cavity():
+    pdb = 'HETATM "\\/ é \U0001f600\n'
+    body = json.dumps({'output': {'pdb_kv': pdb}}).encode('utf-8')
+    cavity = io.BytesIO()
+    ReplyStream(chunks(body, 1), cavity=cavity).read()
+    assert cavity.getvalue().decode('utf-8') == pdb
+
+
+def test_sizes():
+    body = json.dumps(REPLY).encode('utf-8')
+    stream = ReplyStream(chunks(body, 100), fields=FIELD_PATHS, compress=True)
+    stream.read()
+    for name in ['pdb_kv', 'report', 'log']:
+        assert stream.sizes[name] == len(json.dumps(REPLY['output'][name]).encode('utf-8'))
+        assert stream.compressed[name] > 0
+    assert 0 < stream.compressed['response'] < len(body)
+    assert stream.compressed['pdb_kv'] < stream.sizes['pdb_kv']
+
+
+def test_random_chunking():
+    rng = random.Random(1)
+    body = json.dumps(REPLY).encode('utf-8')
+    for _ in range(20):
+        cuts = sorted(rng.sample(range(1, len(body)), 50))
+        parts = [body[i:j] for i, j in zip([0] + cuts, cuts + [len(body)])]
+        assert ReplyStream(parts).read() == REPLY
+
+
+@pytest.mark.parametrize('body', [b'{"id": "1"', b'{"id" "1"}', b'[1 2]', b'{"a": tru}', b''])
+def test_invalid(body):
+    with pytest.raises(ValueError):
+        ReplyStream(chunks(body, 3)).read()
@@ -0,0 +1,57 @@
+import os
+import pytest
+from conftest import EXAMPLES
+from tag import cityhash64, job_tag, body_tag, canonical_json, _float, _lines
+from client import KVJob
+
+
+def data(n: int) -> bytes:
+    return bytes((i * 31 + 7) % 251 for i in range(n))
+
+
+# city::hash64 of kv-server (Rust cityhash crate) for each length, covering
+# every branch of the hash (0-16, 17-32, 33-64 and longer inputs)
+VECTORS = {
+    0: 11160318154034397263,
+    1: 16166381634050148869,
+    3: 8806612642705223807,
+    4: 6221120189753082853,
+    8: 8763816835459018066,
+    9: 15322927018412449219,
+    16: 5388456511531814783,
+    17: 18176466484969301259,
+    32: 4633991830296261895,
+    33: 10840595537936848182,
+    64: 18040482539264092222,
+    65: 8853647989277518893,
+    128: 2400142524218832650,
+    200: 3301701115716049292,
+    1000: 14585196664781669120,
+}
+
+
+@pytest.mark.parametrize('n', sorted(VECTORS))
+def test_cityhash64_matches_server(n):
+    assert cityhash64(data(n)) == VECTORS[n]
+
+
+def test_body_tag():
+    assert body_tag(b'{"settings":{},"pdb":[],"pdb_ligand":null}') == '4622669018374292761'
+
+
+def test_canonical_json_is_compact_in_field_order():
+    job = KVJob(os.path.join(EXAMPLES, '1FMO.pdb'))
+    body = canonical_json(job.input)
+    assert body.startswith('{"settings":{"modes":{"whole_protein_mode":true,"box_mode":false,"resolution_mode":"Low"')
+    assert '"probes":{"probe_in":1.4,"probe_out":4.0}' in body
+    assert body.endswith(',"pdb_ligand":null}')
+    assert job_tag(job.input) == body_tag(body.encode('utf-8'))
+
+
+def test_float_like_serde():
+    assert [_float(x) for x in [4.0, 0.6, 0.0, -1.5, 1e-7, 1e16, 1e21]] == ['4.0', '0.6', '0.0', '-1.5', '1e-7', '1e16', '1e21']
+
+
+def test_lines_escapes_like_serde():
+    assert _lines(['a\n', 'b"\\\té\n']) == '["a\\n","b\\"\\\\\\té\\n"]'
+    assert _lines(None) == 'null'
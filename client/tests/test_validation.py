@@ -0,0 +1,84 @@
+import os
+import copy
+import pytest
+from conftest import EXAMPLES
+from client import KVJob
+from structure import read_atoms
+from validation import check, box_inside_grid
+
+
+@pytest.fixture(scope='module')
+def job_input():
+    return KVJob(os.path.join(EXAMPLES, '1FMO.pdb')).input
+
+
+def with_settings(data, **changes):
+    # Copy of a job input with settings changed ('group.field' keys)
+    data = copy.deepcopy(data)
+    for key, value in changes.items():
+        group, field = key.split('.')
+        data['settings'][group][field] = value
+    return data
+
+
+def test_default_input_is_valid(job_input):
+    check(job_input)
+
+
+@pytest.mark.parametrize('changes', [
+    {'probes.probe_in': 0.0},
+    {'probes.probe_in': 5.0, 'probes.probe_out': 5.0},
+    {'probes.probe_out': 50.0},
+    {'cutoffs.removal_distance': 0.0},
+    {'cutoffs.removal_distance': 10.0},
+    {'cutoffs.volume_cutoff': 0.0},
+])
+def test_limits_are_inclusive(job_input, changes):
+    check(with_settings(job_input, **changes))
+
+
+@pytest.mark.parametrize('changes, message', [
+    ({'modes.box_mode': True}, 'Whole protein and box modes cannot be equal'),
+    ({'modes.resolution_mode': 'Medium'}, 'Resolution mode is restricted'),
+    ({'probes.probe_in': -0.1}, 'Probe In must be between 0 and 5'),
+    ({'probes.probe_in': 5.1}, 'Probe In must be between 0 and 5'),
+    ({'probes.probe_out': 50.1}, 'Probe Out must be between 0 and 50'),
+    ({'probes.probe_out': 1.0}, 'Probe Out must be greater than Probe In'),
+    ({'cutoffs.removal_distance': 10.1}, 'Removal distance must be between 0 and 10'),
+    ({'cutoffs.volume_cutoff': -1.0}, 'Volume cutoff must be greater than 0'),
+    ({'modes.kvp_mode': True}, 'kvp_mode'),
+    ({'modes.ligand_mode': True}, 'A ligand must be provided'),
+    ({'cutoffs.ligand_cutoff': 0.0}, 'Ligand cutoff must be greater than 0'),
+])
+def test_rejected_like_server(job_input, changes, message):
+    with pytest.raises(ValueError, match=message):
+        check(with_settings(job_input, **changes))
+
+
+def test_ligand_without_ligand_mode(job_input):
+    data = copy.deepcopy(job_input)
+    data['pdb_ligand'] = data['pdb'][:1]
+    with pytest.raises(ValueError, match='Ligand mode must be set to true'):
+        check(data)
+
+
+def test_box_inside_grid(job_input):
+    atoms = read_atoms(job_input['pdb'])
+    data = with_settings(job_input, **{'modes.whole_protein_mode': False, 'modes.box_mode': True})
+    check(data, atoms)
+
+    # Grid spans ATOM records extended by probe_out + 20 A
+    xyz = atoms[atoms['record'] == 'ATOM']
+    upper = xyz['x'].max() + data['settings']['probes']['probe_out'] + 20.0
+    data['settings']['internalbox']['p2']['x'] = upper - 0.01
+    assert box_inside_grid(data['settings'], atoms)
+    data['settings']['internalbox']['p2']['x'] = upper + 0.01
+    assert not box_inside_grid(data['settings'], atoms)
+    with pytest.raises(ValueError, match='Inconsistent box coordinates'):
+        check(data)
+
+
+def test_box_without_atom_records(job_input):
+    atoms = read_atoms([line.replace('ATOM  ', 'HETATM') for line in job_input['pdb']])
+    with pytest.raises(ValueError, match='parsing error'):
+        box_inside_grid(job_input['settings'], atoms)
@@ -22,7 +22,9 @@ fn main() {
             )
             .route("/", web::get().to(kv::webserver::hello))
             .route("/{id}", web::get().to(kv::webserver::ask))
+            .route("/{id}/status", web::get().to(kv::webserver::status))
             .route("/create", web::post().to(kv::webserver::create))
+            .route("/status", web::post().to(kv::webserver::batch_status))
     })
     .bind("0.0.0.0:8081")
     .expect("Cannot bind to port 8081")
@@ -445,6 +445,7 @@ mod kv {
         use serde::{Deserialize, Serialize};
         use serde_json;
         use serde_json::json;
+        use std::collections::HashMap;
 
         #[derive(Serialize, Deserialize)]
         struct Job {
@@ -458,6 +459,11 @@ mod kv {
             expires_after: String,
         }
 
+        #[derive(Serialize, Deserialize)]
+        pub struct Batch {
+            ids: Vec<String>,
+        }
+
         #[derive(Serialize, Deserialize)]
         struct QueueConfig<'a> {
             timeout: &'a str,
@@ -489,24 +495,35 @@ mod kv {
             // }
         }
 
-        fn get_queue_id(tag_id: &String) -> Result<Option<u32>, reqwest::Error> {
+        fn get_queue_id(
+            client: &reqwest::Client,
+            tag_id: &String,
+        ) -> Result<Option<u32>, reqwest::Error> {
             // let url = format!("http://0.0.0.0:8023/tag/{}", tag_id);
             let url = format!("http://ocypod:8023/tag/{}", tag_id);
 
             // ids because in theory could be more than one with the same tag, BUT if this happen there is an error
             // if tag_id (hash64) not found in queue Ok(None)
             // if request fail return Err (possible problem in queue server)
-            let mut ids: Vec<u32> = reqwest::get(url.as_str())?.json()?;
+            let mut ids: Vec<u32> = client.get(url.as_str()).send()?.json()?;
             // pop returns last id (should have only one or zero) or None
             Ok(ids.pop())
         }
 
-        fn get_job(tag_id: String) -> Result<Option<Job>, reqwest::Error> {
-            let queue_id = get_queue_id(&tag_id);
+        // job fields requested to ocypod (JOB_FIELDS) and without output (STATUS_FIELDS)
+        const JOB_FIELDS: &str = "status,output,created_at,started_at,ended_at,expires_after";
+        const STATUS_FIELDS: &str = "status,created_at,started_at,ended_at,expires_after";
+
+        fn get_job(
+            client: &reqwest::Client,
+            tag_id: String,
+            fields: &str,
+        ) -> Result<Option<Job>, reqwest::Error> {
+            let queue_id = get_queue_id(client, &tag_id);
             let job = |queue_id| {
-                // let url = format!("http://0.0.0.0:8023/job/{}?fields=status,output,created_at,started_at,ended_at,expires_after", queue_id);
-                let url = format!("http://ocypod:8023/job/{}?fields=status,output,created_at,started_at,ended_at,expires_after", queue_id);
-                let mut j: Job = reqwest::get(url.as_str())?.json()?;
+                // let url = format!("http://0.0.0.0:8023/job/{}?fields={}", queue_id, fields);
+                let url = format!("http://ocypod:8023/job/{}?fields={}", queue_id, fields);
+                let mut j: Job = client.get(url.as_str()).send()?.json()?;
                 j.id = tag_id;
                 Ok(Some(j))
             };
@@ -522,7 +539,7 @@ mod kv {
 
         pub fn ask(id: web::Path<String>) -> impl Responder {
             let tag_id = id.into_inner();
-            let job = get_job(tag_id);
+            let job = get_job(&reqwest::Client::new(), tag_id, JOB_FIELDS);
             match job {
                 Err(e) => HttpResponse::InternalServerError().body(format!("{:?}", e)),
                 Ok(None) => HttpResponse::NotFound().finish(),
@@ -530,6 +547,41 @@ mod kv {
             }
         }
 
+        // same as ask, but the job output is never requested (output is null)
+        pub fn status(id: web::Path<String>) -> impl Responder {
+            let tag_id = id.into_inner();
+            let job = get_job(&reqwest::Client::new(), tag_id, STATUS_FIELDS);
+            match job {
+                Err(e) => HttpResponse::InternalServerError().body(format!("{:?}", e)),
+                Ok(None) => HttpResponse::NotFound().finish(),
+                Ok(Some(j)) => HttpResponse::Ok().json(j),
+            }
+        }
+
+        // most ids in one batch status request (each one takes two requests to ocypod)
+        const MAX_BATCH_SIZE: usize = 1000;
+
+        // status of many jobs in one request: {tag_id: job without output, null if not found,
+        // or {"error": ...} if the queue server failed for this id}
+        pub fn batch_status(batch: web::Json<Batch>) -> impl Responder {
+            let ids = batch.into_inner().ids;
+            if ids.len() > MAX_BATCH_SIZE {
+                return HttpResponse::BadRequest()
+                    .body(format!("At most {} ids per request", MAX_BATCH_SIZE));
+            }
+            // one client for the whole batch, so connections to ocypod are reused
+            let client = reqwest::Client::new();
+            let mut jobs: HashMap<String, serde_json::Value> = HashMap::new();
+            for tag_id in ids {
+                let job = match get_job(&client, tag_id.clone(), STATUS_FIELDS) {
+                    Err(e) => json!({"error": format!("{:?}", e)}),
+                    Ok(j) => json!(j),
+                };
+                jobs.insert(tag_id, job);
+            }
+            HttpResponse::Ok().json(jobs)
+        }
+
         pub fn create(job_input: web::Json<Input>) -> impl Responder {
             // json input values to inp
             let input = job_input.into_inner();
@@ -552,7 +604,7 @@ mod kv {
                     Err(e) => HttpResponse::InternalServerError().body(format!("{:?}", e)),
                 }
             };
-            let job = get_job(data.tags[0].clone());
+            let job = get_job(&reqwest::Client::new(), data.tags[0].clone(), JOB_FIELDS);
             match job {
                 // if err, problem in queue server
                 Err(e) => HttpResponse::InternalServerError().body(format!("{:?}", e)),